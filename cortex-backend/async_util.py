@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# one bounded pool per upstream so a slow GitHub API can't use up the threads DynamoDB reads need
+EXECUTORS = {
+    "dynamo": ThreadPoolExecutor(
+        max_workers=int(os.environ.get("DYNAMO_CONCURRENCY", "16")),
+        thread_name_prefix="dynamo",
+    ),
+    "github": ThreadPoolExecutor(
+        max_workers=int(os.environ.get("GITHUB_CONCURRENCY", "4")),
+        thread_name_prefix="github",
+    ),
+}
+
+
+async def run(dependency, fn, *args, **kwargs):
+    """
+    Await a blocking call on the executor of the upstream it talks to,
+    keeping the event loop free for other requests meanwhile
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTORS[dependency], functools.partial(fn, *args, **kwargs))
+
+
+def dynamo(fn, *args, **kwargs):
+    return run("dynamo", fn, *args, **kwargs)
+
+
+def github(fn, *args, **kwargs):
+    return run("github", fn, *args, **kwargs)
+
+
+async def fan_out(dependency, fn, keys, *args, limit=8, timeout=10.0):
+    """
+    Call fn(key, *args) for every key on the dependency's executor, at most
+    `limit` at a time and each bounded by `timeout` seconds, so a request
+    touching many apps takes about as long as its slowest app.
+
+    A failed or timed out call doesn't fail the others. Note a timed out
+    call's thread still runs to completion in the background.
+
+    Returns:
+    tuple: (results, errors), results maps each key that succeeded to its
+    value in the order of keys, errors maps the others to a message
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def call(key):
+        async with semaphore:
+            return await asyncio.wait_for(run(dependency, fn, key, *args), timeout)
+
+    outcomes = await asyncio.gather(*[call(key) for key in keys], return_exceptions=True)
+
+    results, errors = {}, {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[key] = f"timed out after {timeout}s"
+        elif isinstance(outcome, Exception):
+            errors[key] = str(outcome)
+        else:
+            results[key] = outcome
+    if errors:
+        print(f"{fn.__name__} failed for {len(errors)} of {len(keys)}: {errors}")
+    return results, errors
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    """
+    In-process read-through cache for DynamoDB reads.
+
+    Entries are grouped into namespaces ("apps", "routes", ...) that each get
+    their own TTL, so data that rarely changes such as teams can be held far
+    longer than routes. The whole cache is an LRU bounded at `max_entries`,
+    and writers drop a namespace with `invalidate` instead of waiting out the TTL.
+    """
+
+    def __init__(self, ttls, default_ttl=30, max_entries=1024):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.stats = {}
+
+    def get(self, namespace, key, fn):
+        """
+        Return the cached value of fn() for (namespace, key), calling fn on a
+        miss or once the entry is older than the namespace TTL
+        """
+        hit, value = self._lookup(namespace, key)
+        if hit:
+            return value
+        return self._store(namespace, key, fn())
+
+    async def get_async(self, namespace, key, fn, keep=None):
+        """
+        Same as get, with fn returning an awaitable, so hits are answered
+        without leaving the event loop. Values `keep` rejects, such as
+        partial results, are returned without being cached.
+        """
+        hit, value = self._lookup(namespace, key)
+        if hit:
+            return value
+        value = await fn()
+        if keep and not keep(value):
+            return value
+        return self._store(namespace, key, value)
+
+    def _lookup(self, namespace, key):
+        ttl = self.ttls.get(namespace, self.default_ttl)
+        with self.lock:
+            stats = self.stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            entry = self.entries.get((namespace, key))
+            if entry and time.monotonic() - entry[0] < ttl:
+                self.entries.move_to_end((namespace, key))
+                stats["hits"] += 1
+                return True, entry[1]
+            stats["misses"] += 1
+            return False, None
+
+    def _store(self, namespace, key, value):
+        if value is None:
+            # dynamo_util returns None on errors, don't pin those for a whole TTL
+            return value
+
+        with self.lock:
+            self.entries[(namespace, key)] = (time.monotonic(), value)
+            self.entries.move_to_end((namespace, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces):
+        with self.lock:
+            for cache_key in [k for k in self.entries if not namespaces or k[0] in namespaces]:
+                del self.entries[cache_key]
+
+    def get_stats(self):
+        with self.lock:
+            sizes = {}
+            for namespace, _ in self.entries:
+                sizes[namespace] = sizes.get(namespace, 0) + 1
+            return {
+                namespace: {
+                    **stats,
+                    "hit_ratio": stats["hits"] / max(stats["hits"] + stats["misses"], 1),
+                    "size": sizes.get(namespace, 0),
+                }
+                for namespace, stats in self.stats.items()
+            }
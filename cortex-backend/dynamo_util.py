@@ -1,16 +1,26 @@
 import boto3
 import os
+import time
+import threading
 import warnings
+import zlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from botocore.config import Config
+from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from memory_dynamo_util import MemoryDynamo
+# sized for the scan segments and worker pools that share the client
+MAX_POOL_CONNECTIONS = int(os.environ.get("DYNAMO_MAX_POOL_CONNECTIONS", "32"))
 CERT_PATH = os.environ.get("CERT_PATH", None)
 
-def get_dynamodb_resource():
+def dynamodb_kwargs():
     warnings.filterwarnings('ignore', message='Unverified HTTPS request')
     
     if os.environ.get('USE_LOCAL_DYNAMODB', 'false').lower() == 'true':
-        return boto3.resource(
-            'dynamodb', 
+        return dict(
+            config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
             endpoint_url='http://localhost:8000',
             region_name='ap-southeast-2',
             aws_access_key_id=os.environ.get("AWS_ACCESS_KEY", None),
@@ -24,42 +34,188 @@ def get_dynamodb_resource():
         retries={
             'max_attempts': 10,
             'mode': 'standard'
-        }
+        },
+        max_pool_connections=MAX_POOL_CONNECTIONS,
     )
     
-    session = boto3.Session()
-    return session.resource(
-        'dynamodb',
+    return dict(
         config=boto_config,
         verify=False  # Disable SSL verification
     )
 
-# Initialize DynamoDB resources
-dynamodb = get_dynamodb_resource()
-apps_table = dynamodb.Table('Apps')
-app_versions_table = dynamodb.Table('AppVersions')
-teams_table = dynamodb.Table('Teams')
-routes_table = dynamodb.Table('Routes')
-services_table = dynamodb.Table('Services')
+def new_session():
+    session = boto3.Session()
+    if _memory is not None:
+        _memory.install(session)
+    return session
+
+def get_dynamodb_resource():
+    return new_session().resource('dynamodb', **dynamodb_kwargs())
+
+# Created on first use rather than at import, so CLI runs that never touch
+# DynamoDB don't pay for it. boto3 resources are not thread-safe, so every
+# thread gets its own session, resource and Tables, while the low-level
+# client used for scans and paginated queries is thread-safe and shared.
+_local = threading.local()
+_client = None
+_client_lock = threading.Lock()
+# bumped when the backend changes so every thread drops its resource
+_generation = 0
+_memory = None
+
+def use_memory_dynamo(memory):
+    """
+    Serve every DynamoDB call from an in-process MemoryDynamo instead of AWS,
+    or go back to AWS with None. Used by tests and offline benchmarks.
+    """
+    global _memory, _client, _generation
+    with _client_lock:
+        _memory = memory
+        _client = None
+        _generation += 1
+    invalidate_services()
+    return memory
+
+def get_dynamodb():
+    if getattr(_local, 'generation', None) != _generation:
+        _local.resource = get_dynamodb_resource()
+        _local.tables = {}
+        _local.generation = _generation
+    return _local.resource
 
+def get_table(name):
+    resource = get_dynamodb()
+    if name not in _local.tables:
+        _local.tables[name] = resource.Table(TABLE_NAMES[name])
+    return _local.tables[name]
 
-def get_all_rows(table_name, region_name='ap-southeast-2'):
-    dynamodb = boto3.resource('dynamodb', region_name=region_name)
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # a plain client, resource.meta.client would already deserialize items
+                _client = new_session().client('dynamodb', **dynamodb_kwargs())
+    return _client
+
+def __getattr__(name):
+    # keep dynamo_util.dynamodb / dynamo_util.apps_table working for callers
+    if name == 'dynamodb':
+        return get_dynamodb()
+    if name.endswith('_table') and name[:-len('_table')] in TABLE_NAMES:
+        return get_table(name[:-len('_table')])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+SERVICES_TTL = int(os.environ.get("SERVICES_TTL", "300"))
+_services_index = {}
+_services_lock = threading.Lock()
+
+TABLE_NAMES = {
+    'apps': 'Apps',
+    'app_versions': 'AppVersions',
+    'teams': 'Teams',
+    'routes': 'Routes',
+    'services': 'Services',
+    'team_dashboard': 'TeamDashboard',
+}
+SCAN_SEGMENTS = int(os.environ.get("DYNAMO_SCAN_SEGMENTS", "4"))
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+# TransactWriteItems accepts at most this many actions
+TRANSACT_LIMIT = 100
+
+
+def projection_kwargs(attributes):
+    """ProjectionExpression arguments with every attribute behind a placeholder"""
+    if not attributes:
+        return {}
+    names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names,
+    }
+
+def scan_segment(table_name, segment, total_segments, attributes=None, client=None):
+    # items come back typed, so this needs a plain client, not resource.meta.client
+    paginator = (client or get_client()).get_paginator('scan')
+    pages = paginator.paginate(
+        TableName=table_name,
+        Segment=segment,
+        TotalSegments=total_segments,
+        **projection_kwargs(attributes),
+    )
+    items = []
+    for page in pages:
+        for item in page.get('Items', []):
+            items.append({k: _deserializer.deserialize(v) for k, v in item.items()})
+    return items
+
+def get_all_rows(table_name, attributes=None, segments=SCAN_SEGMENTS, client=None):
+    """
+    Read a whole table with a parallel segmented scan
     
-    all_items = []
-    response = routes_table.scan()
-    all_items.extend(response.get('Items', []))
+    Parameters:
+    table_name (str): table name, or its lowercase alias e.g. "routes"
+    attributes (list): optional attributes to project
+    segments (int): number of segments scanned concurrently
+    client: optional low-level DynamoDB client, e.g. for another region
+    
+    Returns:
+    list: every item in the table
+    """
+    table_name = TABLE_NAMES.get(table_name, table_name)
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        futures = [
+            executor.submit(scan_segment, table_name, segment, segments, attributes, client)
+            for segment in range(segments)
+        ]
+        return [item for future in futures for item in future.result()]
+
+def get_item(table, key, attributes=None):
+    response = table.get_item(Key=key, **projection_kwargs(attributes))
+    return response.get('Item')
+
+def query_items(table, attributes=None, **kwargs):
+    """
+    Yield every item a query matches, following LastEvaluatedKey
     
-    while 'LastEvaluatedKey' in response:
-        response = routes_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        all_items.extend(response.get('Items', []))
+    Parameters:
+    table: boto3 Table
+    attributes (list): optional attributes to project
+    kwargs: passed through to Table.query, e.g. KeyConditionExpression, IndexName
+    """
+    kwargs.update(projection_kwargs(attributes))
+    while True:
+        response = table.query(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def batch_get(table_name, keys, attributes=None):
+    """
+    BatchGetItem the given keys in chunks of 100, retrying unprocessed keys
     
-    return all_items
+    Returns:
+    list: the items that exist, in no particular order
+    """
+    keys = list(keys)
+    items = []
+    for i in range(0, len(keys), 100):
+        request = {table_name: {'Keys': keys[i:i + 100], **projection_kwargs(attributes)}}
+        attempt = 0
+        while request:
+            if attempt:
+                time.sleep(min(0.05 * 2 ** attempt, 2))
+            response = get_dynamodb().batch_get_item(RequestItems=request)
+            items += response.get('Responses', {}).get(table_name, [])
+            request = response.get('UnprocessedKeys')
+            attempt += 1
+    return items
 
 def get_teams():
     try:
-        response = teams_table.scan()
-        items = response.get('Items', [])
+        items = get_all_rows('teams', ['team_id', 'team_name'], segments=1)
         
         # Format the response to match the existing API
         result = []
@@ -71,118 +227,209 @@ def get_teams():
         
         return result
     except Exception as e:
-        print(f"Error in get_all_apps: {str(e)}")
-        return []
+        print(f"Error in get_teams: {str(e)}")
+        # None rather than [] so read caches don't keep the failure as an empty result
+        return None
 
 def get_app(app_name=None):
     try:
-        response = apps_table.scan()
-        items = response.get('Items', [])
-        
-        for item in items:
-            if app_name == item.get("name", ""):
-                return {
-                    **item,
-                    "App": item.get('name'),
-                    "Service Count": item.get('service_count'),
-                    "Versions": item.get('versions'),
-                    "Last Updated": item.get('last_updated'),
-                    "Owner": item.get('owner'),
-                    "CommandRepoURL": item.get('command_repo_url'),
-                    "services": item.get('services'),
-                    "dependencies": item.get('dependencies'),
-                }
+        item = get_item(get_table('apps'), {'name': app_name}) if app_name else None
+        if item:
+            return {
+                **item,
+                "App": item.get('name'),
+                "Service Count": item.get('service_count'),
+                "Versions": item.get('versions'),
+                "Last Updated": item.get('last_updated'),
+                "Owner": item.get('owner'),
+                "CommandRepoURL": item.get('command_repo_url'),
+                "services": item.get('services'),
+                "dependencies": item.get('dependencies'),
+            }
         return None
     except Exception as e:
-        print(f"Error in get_all_apps: {str(e)}")
-        return []
+        print(f"Error in get_app: {str(e)}")
+        return None
+
+def get_team_app_items(team_id, attributes=None):
+    """
+    Apps of a team through the TeamIdIndex GSI on Apps (manual/apps_gsi.json),
+    falling back to a filtered scan where the index has not been created yet
+    """
+    try:
+        return list(query_items(
+            get_table('apps'), attributes,
+            IndexName='TeamIdIndex',
+            KeyConditionExpression=Key('team_id').eq(int(team_id)),
+        ))
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ValidationException':
+            raise
+        print(f"TeamIdIndex missing on Apps, scanning instead: {str(e)}")
+        return [i for i in get_all_rows('apps', attributes) if int(i.get('team_id', 0)) == int(team_id)]
+
+def format_app(item):
+    return {
+        **item,
+        "App": item.get('name'),
+        "Service Count": item.get('service_count'),
+        "Versions": item.get('versions'),
+        "Last Updated": item.get('last_updated'),
+        "Owner": item.get('owner'),
+        "CommandRepoURL": item.get('command_repo_url')
+    }
 
 def get_apps(team_id=None):
     try:
-        response = apps_table.scan()
-        items = response.get('Items', [])
+        items = get_team_app_items(team_id) if team_id else []
         
         formatted_apps = []
         for item in items:
-            if team_id and int(item.get("team_id", "0")) == int(team_id):
-                formatted_apps.append({
-                    **item,
-                    "App": item.get('name'),
-                    "Service Count": item.get('service_count'),
-                    "Versions": item.get('versions'),
-                    "Last Updated": item.get('last_updated'),
-                    "Owner": item.get('owner'),
-                    "CommandRepoURL": item.get('command_repo_url')
-                })
+            formatted_apps.append(format_app(item))
         
         return formatted_apps
     except Exception as e:
-        print(f"Error in get_all_apps: {str(e)}")
-        return []
+        print(f"Error in get_apps: {str(e)}")
+        return None
 
 def get_app_by_name(name):
     try:
-        response = apps_table.get_item(
-            Key={
-                'name': name
-            }
-        )
-        return response.get('Item')
+        return get_item(get_table('apps'), {'name': name})
     except Exception as e:
         print(f"Error in get_app_by_name: {str(e)}")
         return None
 
 # Functions for AppVersions table
-def get_app_versions(app_name):
+# manifests are stored zlib compressed in a binary attribute, the parsed
+# services/dependencies/links next to them cover most reads
+COMPRESSED_MANIFEST = 'yaml_z'
+
+def encode_manifest(item):
+    """Swap the raw yaml of an AppVersions item for its compressed form"""
+    if item.get('yaml') is None:
+        return item
+    item = dict(item)
+    item[COMPRESSED_MANIFEST] = zlib.compress(item.pop('yaml').encode(), 9)
+    return item
+
+def decode_manifest(item):
+    """Give an AppVersions item back its raw yaml, whichever way it was stored"""
+    if not item or COMPRESSED_MANIFEST not in item:
+        return item
+    item = dict(item)
+    value = item.pop(COMPRESSED_MANIFEST)
+    # Binary from the resource API, bytes from the low-level client
+    item['yaml'] = zlib.decompress(getattr(value, 'value', value)).decode()
+    return item
+
+# attributes each AppVersions reader actually needs, None reads the whole item
+APP_VERSION_PROFILES = {
+    'summary': ['app_name', 'version', 'run_id'],
+    'graph': ['app_name', 'version', 'run_id', 'services', 'dependencies', 'links'],
+    'full': None,
+}
+
+def query_app_versions_page(app_name, profile='full', limit=None, newest_first=False, cursor=None):
+    """
+    Read one page of an app's versions
+    
+    Parameters:
+    app_name (str): App name
+    profile (str): key of APP_VERSION_PROFILES
+    limit (int): maximum number of versions to read
+    newest_first (bool): walk the version sort key backwards
+    cursor (int): version the previous page stopped at
+    
+    Returns:
+    tuple: (items, cursor), cursor is None on the last page
+    """
+    kwargs = {
+        'KeyConditionExpression': Key('app_name').eq(app_name),
+        'ScanIndexForward': not newest_first,
+        **projection_kwargs(APP_VERSION_PROFILES[profile]),
+    }
+    if limit:
+        # DynamoDB returns a LastEvaluatedKey whenever Limit is reached, even
+        # with nothing left, so read one more row to tell the last page apart
+        kwargs['Limit'] = limit + 1
+    if cursor is not None:
+        kwargs['ExclusiveStartKey'] = {'app_name': app_name, 'version': int(cursor)}
+    response = get_table('app_versions').query(**kwargs)
+    items = response.get('Items', [])
+    if limit and len(items) > limit:
+        items = items[:limit]
+        return items, int(items[-1]['version'])
+    last_key = response.get('LastEvaluatedKey')
+    return items, int(last_key['version']) if last_key else None
+
+def iter_app_versions(app_name, profile='full', limit=None, newest_first=False, cursor=None):
+    """
+    Yield an app's versions page by page, stopping after limit items
+    """
+    remaining = limit
+    while True:
+        items, cursor = query_app_versions_page(app_name, profile, remaining, newest_first, cursor)
+        yield from (decode_manifest(item) for item in items)
+        if remaining:
+            remaining -= len(items)
+            if remaining <= 0:
+                return
+        if cursor is None:
+            return
+
+def format_app_version(item):
+    graph_data = item.get('graph')
+    if isinstance(graph_data, str):
+        try:
+            graph_data = json.loads(graph_data)
+        except ValueError:
+            graph_data = None
+    
+    return {
+        "app_name": item.get('app_name'),
+        "version": item.get('version'),
+        "yaml": item.get('yaml', ''),
+        "run_id": int(item.get('run_id', '')),
+        "graph": graph_data,
+        "graph_layout": item.get('graph_layout'),
+    }
+
+def get_app_versions(app_name, limit=None, newest_first=False):
     """
     Get all versions of a specific app
     
     Parameters:
     app_name (str): App name
+    limit (int): optionally only the first limit versions
+    newest_first (bool): order versions from the most recent
     
     Returns:
     dict: Dictionary with version numbers as keys and app version data as values
     """
     try:
-        response = app_versions_table.query(
-            KeyConditionExpression=Key('app_name').eq(app_name)
-        )
-        
-        result = []
-        for item in response.get('Items', []):
-            version_num = item.get('version')
-            
-            graph_data = item.get('graph', {})
-            if isinstance(graph_data, str):
-                import json
-                try:
-                    graph_data = json.loads(graph_data)
-                except:
-                    graph_data = {}
-            
-            result.append({
-                "app_name": app_name,
-                "version": item.get('version'),
-                "yaml": item.get('yaml', ''),
-                "run_id": int(item.get('run_id', '')),
-            })
-        
-        return result
+        return [format_app_version(item) for item in iter_app_versions(app_name, 'full', limit, newest_first)]
     except Exception as e:
         print(f"Error in get_app_versions: {str(e)}")
         return {}
 
-def get_app_versions2(app_name):
+def get_app_versions_page(app_name, limit, cursor=None):
+    """
+    One page of an app's versions, newest first
+    
+    Parameters:
+    app_name (str): App name
+    limit (int): versions per page
+    cursor (int): next_cursor of the previous page
+    
+    Returns:
+    tuple: (versions, next_cursor), next_cursor is None on the last page
+    """
+    items, next_cursor = query_app_versions_page(app_name, 'full', limit, newest_first=True, cursor=cursor)
+    return [format_app_version(decode_manifest(item)) for item in items], next_cursor
+
+def get_app_versions2(app_name, profile='full'):
     try:
-        response = app_versions_table.query(
-            KeyConditionExpression=Key('app_name').eq(app_name)
-        )
-        
-        result = []
-        for item in response.get('Items', []):
-            result.append(item)
-        
-        return result
+        return list(iter_app_versions(app_name, profile))
     except Exception as e:
         print(f"Error in get_app_versions2: {str(e)}")
         return {}
@@ -199,17 +446,158 @@ def get_app_version(app_name, version):
     dict: App version item or None if not found
     """
     try:
-        response = app_versions_table.get_item(
+        response = get_table('app_versions').get_item(
             Key={
                 'app_name': app_name,
                 'version': version
             }
         )
-        return response.get('Item')
+        return decode_manifest(response.get('Item'))
     except Exception as e:
         print(f"Error in get_app_version: {str(e)}")
         return None
 
+def put_app_version_graph(app_name, version, graph_data, layout):
+    """
+    Store the laid out dependency graph of an app version, tagged with the
+    layout version that produced it
+    """
+    get_table('app_versions').update_item(
+        Key={'app_name': app_name, 'version': version},
+        UpdateExpression='SET #g = :g, #l = :l',
+        ExpressionAttributeNames={'#g': 'graph', '#l': 'graph_layout'},
+        ExpressionAttributeValues={':g': json.dumps(graph_data), ':l': layout},
+    )
+
+def get_app_names():
+    return [item['name'] for item in get_all_rows('apps', ['name'])]
+
+def get_app_version_manifests(app_name):
+    """
+    Stream the stored manifest of every version of an app, projecting only
+    the manifest and following LastEvaluatedKey through every page
+    
+    Parameters:
+    app_name (str): App name
+    
+    Yields:
+    tuple: (version, manifest yaml)
+    """
+    paginator = get_client().get_paginator('query')
+    pages = paginator.paginate(
+        TableName='AppVersions',
+        KeyConditionExpression='app_name = :app_name',
+        ExpressionAttributeValues={':app_name': {'S': app_name}},
+        ProjectionExpression='#v, #y, #z',
+        ExpressionAttributeNames={'#v': 'version', '#y': 'yaml', '#z': COMPRESSED_MANIFEST},
+        ConsistentRead=True,
+    )
+    for page in pages:
+        for item in page.get('Items', []):
+            item = decode_manifest({k: _deserializer.deserialize(v) for k, v in item.items()})
+            if 'yaml' in item:
+                yield int(item['version']), item['yaml']
+
+# TeamDashboard holds one row per app version ("version#<name>#<version>")
+# of a team, written alongside AppVersions at deploy time, so a team's
+# versions are answered by one query instead of one per app
+def dependency_edges(app_version):
+    """
+    Links of an app version as "<app>/<svc>@<ver>" source -> target edges
+    """
+    lookup = {f"{s['app']}/{s['svc']}": s['svc_ver'] for s in app_version["services"] + app_version["dependencies"]}
+    edges = []
+    for link in app_version["links"]:
+        source = f"{link['source']['app']}/{link['source']['svc']}"
+        target = f"{link['target']['app']}/{link['target']['svc']}"
+        if source not in lookup or target not in lookup:
+            print(f"Skipping link {source} -> {target} of {app_version['app_name']}, it names an undeclared service")
+            continue
+        edges.append({"source": f"{source}@{lookup[source]}", "target": f"{target}@{lookup[target]}"})
+    return edges
+
+def dashboard_version_row(team_id, app_version):
+    row = {k: app_version.get(k) for k in APP_VERSION_PROFILES['graph']}
+    return {
+        **row,
+        'team_id': team_id,
+        'sk': f"version#{app_version['app_name']}#{int(app_version['version']):08d}",
+        'edges': dependency_edges(app_version),
+    }
+
+def put_dashboard_version(team_id, app_version):
+    """
+    Write the TeamDashboard row of an app version. It is only a read model,
+    get_team_dashboard_versions reads AppVersions for apps missing rows, so
+    a failed write is logged instead of failing the deploy.
+    
+    Returns:
+    bool: whether the row was written
+    """
+    try:
+        get_table('team_dashboard').put_item(Item=dashboard_version_row(team_id, app_version))
+        return True
+    except Exception as e:
+        print(f"Error in put_dashboard_version: {str(e)}")
+        return False
+
+def build_dashboard(apps, app_versions):
+    """
+    Merge formatted apps and their versions into the dashboard payload
+    """
+    dependency_graph = {}
+    services = set()
+    for av in app_versions:
+        services.update(f"{s['app']}/{s['svc']}" for s in av["services"] + av["dependencies"])
+        for edge in av.get("edges") or dependency_edges(av):
+            dependency_graph.setdefault(edge["source"], []).append({
+                "target": edge["target"],
+                "appVersion": av["version"],
+            })
+    
+    return {
+        "apps": apps,
+        "app_versions": [{k: v for k, v in av.items() if k not in ('team_id', 'sk', 'edges')} for av in app_versions],
+        "dependency_graph": dependency_graph,
+        "services": services,
+    }
+
+def get_team_dashboard_versions(team_id, apps):
+    """
+    Read a team's app versions from its TeamDashboard rows
+    
+    Parameters:
+    team_id (int): Team ID
+    apps (list): the team's apps, from get_apps
+    
+    Returns:
+    tuple: (app_versions, missing), missing names the apps whose rows don't
+    hold every version yet, e.g. versions stored before TeamDashboard
+    existed, their versions have to be read from AppVersions instead
+    """
+    try:
+        rows = list(query_items(
+            get_table('team_dashboard'),
+            KeyConditionExpression=Key('team_id').eq(int(team_id)) & Key('sk').begins_with('version#'),
+        ))
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise
+        print(f"TeamDashboard table missing, reading AppVersions instead: {str(e)}")
+        return [], [app['App'] for app in apps]
+    rows_by_app = {}
+    for row in rows:
+        rows_by_app.setdefault(row['app_name'], []).append(row)
+    
+    app_versions, missing = [], []
+    for app in apps:
+        app_rows = rows_by_app.get(app['App'], [])
+        if len(app_rows) < int(app['Versions'] or 0):
+            missing.append(app['App'])
+        else:
+            app_versions += app_rows
+    return app_versions, missing
+
 # For testing - creates a fallback table if needed
 def ensure_tables_exist():
     """
@@ -218,26 +606,33 @@ def ensure_tables_exist():
     try:
         # Check if Apps table exists
         try:
-            apps_table.table_status
+            get_table('apps').table_status
         except:
             print("Creating Apps table...")
-            dynamodb.create_table(
+            get_dynamodb().create_table(
                 TableName='Apps',
                 KeySchema=[
                     {'AttributeName': 'name', 'KeyType': 'HASH'}
                 ],
                 AttributeDefinitions=[
-                    {'AttributeName': 'name', 'AttributeType': 'S'}
+                    {'AttributeName': 'name', 'AttributeType': 'S'},
+                    {'AttributeName': 'team_id', 'AttributeType': 'N'}
                 ],
+                GlobalSecondaryIndexes=[{
+                    'IndexName': 'TeamIdIndex',
+                    'KeySchema': [{'AttributeName': 'team_id', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'},
+                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+                }],
                 ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
             )
         
         # Check if AppVersions table exists
         try:
-            app_versions_table.table_status
+            get_table('app_versions').table_status
         except:
             print("Creating AppVersions table...")
-            dynamodb.create_table(
+            get_dynamodb().create_table(
                 TableName='AppVersions',
                 KeySchema=[
                     {'AttributeName': 'app_name', 'KeyType': 'HASH'},
@@ -249,6 +644,23 @@ def ensure_tables_exist():
                 ],
                 ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
             )
+        
+        try:
+            get_table('team_dashboard').table_status
+        except:
+            print("Creating TeamDashboard table...")
+            get_dynamodb().create_table(
+                TableName='TeamDashboard',
+                KeySchema=[
+                    {'AttributeName': 'team_id', 'KeyType': 'HASH'},
+                    {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+                ],
+                AttributeDefinitions=[
+                    {'AttributeName': 'team_id', 'AttributeType': 'N'},
+                    {'AttributeName': 'sk', 'AttributeType': 'S'}
+                ],
+                ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            )
             
         return True
     except Exception as e:
@@ -258,17 +670,17 @@ def ensure_tables_exist():
 
 def get_routes(team_id):
     try:
-        response = routes_table.query(
+        return list(query_items(
+            get_table('routes'),
             IndexName='TeamIdIndex',
             KeyConditionExpression=Key('team_id').eq(team_id)
-        )
-        return response.get('Items', [])
+        ))
     except Exception as e:
         print(f"Error in get_routes: {str(e)}")
         return None
 
 def put_route(payload):
-    response = routes_table.put_item(
+    response = get_table('routes').put_item(
         Item={
             'prefix': payload["prefix"],
             'team_id': payload["team_id"],
@@ -279,20 +691,105 @@ def put_route(payload):
 
 def get_service(full_name=None):
     try:
-        response = services_table.get_item(
-            Key={
-                'name': full_name
-            }
-        )
-        return response.get('Item')
+        return get_item(get_table('services'), {'name': full_name})
     except Exception as e:
         print(f"Error in get_service: {str(e)}")
         return None
     
 def get_services():
     try:
-        response = services_table.scan()
-        return response.get('Items', [])
+        return get_all_rows('services')
     except Exception as e:
         print(f"Error in get_services: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+def batch_get_services(names):
+    items = batch_get('Services', [{'name': n} for n in names])
+    return {item['name']: item for item in items}
+
+def get_services_by_name(names):
+    """
+    Look services up through the in-process services index, only fetching
+    names that are missing or older than SERVICES_TTL seconds. Names that
+    aren't registered yet are not remembered, the deploy that registers
+    them may run in another process that can't invalidate this index.
+    
+    Parameters:
+    names (iterable): full service names, e.g. "app1/service-b@0.0.1"
+    
+    Returns:
+    dict: service name -> item
+    """
+    now = time.monotonic()
+    result = {}
+    missing = []
+    with _services_lock:
+        for name in set(names):
+            entry = _services_index.get(name)
+            if entry and now - entry[0] < SERVICES_TTL:
+                result[name] = entry[1]
+            else:
+                missing.append(name)
+    
+    fetched = batch_get_services(missing) if missing else {}
+    with _services_lock:
+        for name, item in fetched.items():
+            _services_index[name] = (now, item)
+    
+    result.update(fetched)
+    return result
+
+def invalidate_services(names=None):
+    with _services_lock:
+        if names is None:
+            _services_index.clear()
+        for name in names or []:
+            _services_index.pop(name, None)
+
+def write_items(puts, max_attempts=5):
+    """
+    Put items across tables in a single TransactWriteItems call, so a deploy
+    registers everything or nothing. Cancellations caused by conflicts or
+    throttling are retried with backoff. Above TRANSACT_LIMIT puts it falls
+    back to batch_writer, which resends unprocessed items but is not atomic.
+    
+    Parameters:
+    puts (list): (table, item) pairs, table is a key of TABLE_NAMES
+    """
+    if len(puts) > TRANSACT_LIMIT:
+        print(f"{len(puts)} puts is over the transaction limit, writing in batches")
+        for table_name in {t for t, _ in puts}:
+            with get_table(table_name).batch_writer() as batch:
+                for t, item in puts:
+                    if t == table_name:
+                        batch.put_item(Item=item)
+    else:
+        transact_items = [
+            {'Put': {
+                'TableName': TABLE_NAMES[t],
+                'Item': {k: _serializer.serialize(v) for k, v in item.items()},
+            }}
+            for t, item in puts
+        ]
+        for attempt in range(max_attempts):
+            try:
+                get_client().transact_write_items(TransactItems=transact_items)
+                break
+            except ClientError as e:
+                reasons = {r.get('Code') for r in e.response.get('CancellationReasons', [])}
+                retryable = reasons & {'TransactionConflict', 'ThrottlingError', 'ProvisionedThroughputExceeded'}
+                if e.response['Error']['Code'] != 'TransactionCanceledException' or not retryable or attempt == max_attempts - 1:
+                    raise
+                time.sleep(min(0.05 * 2 ** attempt, 2))
+    
+    invalidate_services([item['name'] for t, item in puts if t == 'services'])
+
+if os.environ.get('USE_MEMORY_DYNAMODB', 'false').lower() == 'true':
+    # MEMORY_DYNAMODB_SEED: "fleet" or comma separated upload scripts such as manual/dynamo_test_data.py
+    _seeded = MemoryDynamo()
+    for seed in filter(None, os.environ.get('MEMORY_DYNAMODB_SEED', '').split(',')):
+        if seed == 'fleet':
+            _seeded.seed_fleet()
+        else:
+            _seeded.seed_from_script(seed)
+    use_memory_dynamo(_seeded)
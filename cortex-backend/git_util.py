@@ -145,12 +145,64 @@ def raise_pull_request(owner, repo_name, github_token, branch_name, logger):
             "branch_name": branch_name
         }
 
-def get_workflow_runs(repo_url, workflow_name):
+def format_workflow_run(run, workflow_display_name):
+    from datetime import datetime, timezone
+    import dateutil.parser
+    
+    # Convert the created_at time to a more readable format
+    created_at = dateutil.parser.parse(run["created_at"])
+    
+    # Calculate how long ago the run was created
+    now = datetime.now(timezone.utc)
+    created_ago = now - created_at
+    
+    # Format as minutes or hours ago
+    if created_ago.days > 0:
+        created_ago_str = f"{created_ago.days} days ago"
+    elif created_ago.seconds // 3600 > 0:
+        created_ago_str = f"{created_ago.seconds // 3600} hours ago"
+    else:
+        created_ago_str = f"{max(1, created_ago.seconds // 60)} minutes ago"
+    
+    return {
+        "id": run["id"],
+        "name": workflow_display_name,  # Use the workflow name directly
+        "run_number": run["run_number"],
+        "status": run["status"],
+        "conclusion": run["conclusion"],
+        "created_at": run["created_at"],
+        "created_ago": created_ago_str,
+        "html_url": run["html_url"],
+        "actor": run["actor"]["login"] if "actor" in run else "Unknown",
+        "head_branch": run["head_branch"],
+        "duration": run.get("duration", 0) / 60 if run.get("duration") else None,
+        "run_attempt": run.get("run_attempt", 1)
+    }
+
+def get_workflow_run(repo_url, run_id):
+    """
+    Fetch a single workflow run by id, for runs that are not on the first
+    page of get_workflow_runs. Raises on request failures.
+    
+    Returns:
+    dict: the run, formatted like the entries of get_workflow_runs
+    """
+    github_token = os.environ.get("GITHUB_TOKEN")
+    owner, repo_name = get_owner_and_repo_from_url(repo_url)
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    
+    api_url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/runs/{run_id}"
+    response = requests.get(api_url, headers=headers, verify="ca.crt", timeout=30)
+    response.raise_for_status()
+    run = response.json()
+    return format_workflow_run(run, run["name"])
+
+def get_workflow_runs(repo_url, workflow_name, per_page=None, page=None):
     import os
     import logging
     import requests
-    from datetime import datetime, timezone
-    import dateutil.parser
     
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger("workflows")
@@ -206,50 +258,20 @@ def get_workflow_runs(repo_url, workflow_name):
         api_url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/workflows/{workflow_id}/runs"
         
         logger.info(f"Fetching runs for workflow {workflow_id} from: {api_url}")
-        response = requests.get(api_url, headers=headers, verify="ca.crt")
+        params = {k: v for k, v in {"per_page": per_page, "page": page}.items() if v}
+        response = requests.get(api_url, headers=headers, params=params, verify="ca.crt")
         
         if response.status_code == 200:
             workflow_data = response.json()
             
-            # Process workflow runs
-            processed_runs = []
-            for run in workflow_data.get("workflow_runs", []):
-                # Convert the created_at time to a more readable format
-                created_at = dateutil.parser.parse(run["created_at"])
-                updated_at = dateutil.parser.parse(run["updated_at"])
-                
-                # Calculate how long ago the run was created/updated
-                now = datetime.now(timezone.utc)
-                created_ago = now - created_at
-                updated_ago = now - updated_at
-                
-                # Format as minutes or hours ago
-                if created_ago.days > 0:
-                    created_ago_str = f"{created_ago.days} days ago"
-                elif created_ago.seconds // 3600 > 0:
-                    created_ago_str = f"{created_ago.seconds // 3600} hours ago"
-                else:
-                    created_ago_str = f"{max(1, created_ago.seconds // 60)} minutes ago"
-                
-                processed_runs.append({
-                    "id": run["id"],
-                    "name": target_workflow["name"],  # Use the workflow name directly
-                    "run_number": run["run_number"],
-                    "status": run["status"],
-                    "conclusion": run["conclusion"],
-                    "created_at": run["created_at"],
-                    "created_ago": created_ago_str,
-                    "html_url": run["html_url"],
-                    "actor": run["actor"]["login"] if "actor" in run else "Unknown",
-                    "head_branch": run["head_branch"],
-                    "duration": run.get("duration", 0) / 60 if run.get("duration") else None,
-                    "run_attempt": run.get("run_attempt", 1)
-                })
+            processed_runs = [format_workflow_run(run, target_workflow["name"]) for run in workflow_data.get("workflow_runs", [])]
             
             return {
                 "status": "success",
                 "workflow_runs": processed_runs,
-                "total_count": workflow_data.get("total_count", 0)
+                "total_count": workflow_data.get("total_count", 0),
+                # GitHub pages are numbered from 1, the Link header says whether there is another
+                "next_page": (page or 1) + 1 if "next" in response.links else None
             }
         else:
             logger.error(f"Failed to get workflow runs. Status: {response.status_code}, Response: {response.text}")
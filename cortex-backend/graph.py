@@ -1,6 +1,10 @@
 import yaml
 import math
 
+# bump whenever calculate_graph lays graphs out differently, graphs stored
+# with an older version are recomputed the next time they are read
+LAYOUT_VERSION = 1
+
 def add_app_dims_and_positions(main_app, apps, app_services_count):
     total_apps = len(apps)
     
@@ -162,7 +166,6 @@ def calculate_graph(main_app, data):
     # print(yaml_data)
     yaml_data = yaml.safe_load(data)
     
-    print(data)
     services = []
     seen = set()
     for s in yaml_data["services"] + yaml_data.get("dependencies", []):
@@ -268,6 +271,4 @@ def calculate_graph(main_app, data):
         "apps": apps
     }
     
-    print("!!",result)
-    
     return result
\ No newline at end of file
@@ -6,11 +6,22 @@ import graph_original
 import dynamo_util
 import envoy_util
 import git_util
+import trigger_util
+import cache_util
+import async_util
+import etag_util
+import status_util
 
-from fastapi import FastAPI, Body
-from typing import List, Dict, Any
+from fastapi import Body, Request, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 
-import requests
+import asyncio
+import os
+import math
+import hashlib
+import hmac
+import json
 
 import logging
 
@@ -23,45 +34,192 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# polled by cortex-web, no-cache makes browsers revalidate every time and get a 304 when nothing changed
+etag_util.add_etags(app, {
+    "/get_teams": "private, max-age=60",
+    "/get_app": "private, no-cache",
+    "/get_apps": "private, no-cache",
+    "/get_app_versions": "private, no-cache",
+    "/get_routes": "private, no-cache",
+    "/get_workflow_runs": "private, no-cache",
+    "/get_app_dashboard_data": "private, no-cache",
+    "/get_incomplete_runs": "private, no-cache",
+    # "<app>/<svc>@<ver>" never changes once deployed
+    "/get_service": "private, max-age=300",
+})
+
+# coalesces bursts of /update_envoy calls (e.g. several apps deploying at once) into one compile
+envoy_trigger = trigger_util.CoalescingTrigger(
+    envoy_util.update_envoy,
+    debounce=float(os.environ.get("UPDATE_ENVOY_DEBOUNCE", "2")),
+)
+
+RUN_POLL_INTERVAL = float(os.environ.get("RUN_POLL_INTERVAL", "5"))
+
+# dashboards poll these endpoints, so serve repeat reads from memory for a few seconds
+read_cache = cache_util.ReadCache(
+    {"teams": 300, "apps": 30, "app": 30, "dashboard": 30, "routes": 15, "runs": 300,
+     "workflow_runs": RUN_POLL_INTERVAL},
+    max_entries=int(os.environ.get("READ_CACHE_SIZE", "1024")),
+)
+
+# per upstream call when an endpoint fans out over several apps or repos
+FAN_OUT_TIMEOUT = float(os.environ.get("FAN_OUT_TIMEOUT", "10"))
+
+# calculate_graph is pure, so laid out graphs never expire, they are only evicted
+graph_cache = cache_util.ReadCache(
+    {"graph": math.inf},
+    max_entries=int(os.environ.get("GRAPH_CACHE_SIZE", "2048")),
+)
+
+# one GitHub poller per watched repo, shared by every browser subscribed to /subscribe_runs
+run_watcher = status_util.RunWatcher(
+    lambda repo_url, workflow_name: async_util.github(git_util.get_workflow_runs, repo_url, workflow_name),
+    interval=RUN_POLL_INTERVAL,
+    idle_interval=float(os.environ.get("RUN_IDLE_POLL_INTERVAL", "30")),
+)
+SSE_KEEPALIVE = float(os.environ.get("SSE_KEEPALIVE", "15"))
+
+async def listed_workflow_runs(repo_url, workflow_name, per_page=None, page=None):
+    # tabs that poll without a subscription share one GitHub call per repo and poll interval
+    return await read_cache.get_async(
+        "workflow_runs", (repo_url, workflow_name, per_page, page),
+        lambda: async_util.github(git_util.get_workflow_runs, repo_url, workflow_name, per_page=per_page, page=page),
+        keep=lambda result: "workflow_runs" in result,
+    )
+
+async def watched_workflow_runs(repo_url, workflow_name):
+    # while a watcher polls the repo anyway, answer from its snapshot instead of asking GitHub again
+    snapshot = run_watcher.latest(repo_url, workflow_name)
+    if snapshot is not None:
+        return {"status": "success", "workflow_runs": snapshot["workflow_runs"]}
+    return await listed_workflow_runs(repo_url, workflow_name)
+
+def cached_workflow_run(run_id, repo_url):
+    return read_cache.get("runs", (repo_url, run_id), lambda: git_util.get_workflow_run(repo_url, run_id))
+
+# GitHub's largest page of runs, older versions are joined a hundred runs per request
+RUNS_PAGE_SIZE = 100
+RUNS_MAX_PAGES = int(os.environ.get("RUNS_MAX_PAGES", "10"))
+
+def cached_runs_page(repo_url, workflow_name, page):
+    def list_runs():
+        result = git_util.get_workflow_runs(repo_url, workflow_name, per_page=RUNS_PAGE_SIZE, page=page)
+        if "workflow_runs" not in result:
+            # raising keeps the error out of the cache
+            raise RuntimeError(result.get("message"))
+        return result
+    return read_cache.get("runs", (repo_url, workflow_name, page), list_runs)
+
+def find_workflow_runs(repo_url, workflow_name, run_ids):
+    """
+    Look up runs by id through the cached pages of the repo's run list
+    instead of one GitHub request per run
+    
+    Returns:
+    dict: run id -> run, for the ids found within RUNS_MAX_PAGES pages
+    """
+    missing = set(run_ids)
+    found = {}
+    page = 1
+    while missing and page and page <= RUNS_MAX_PAGES:
+        result = cached_runs_page(repo_url, workflow_name, page)
+        runs = result["workflow_runs"]
+        for run in runs:
+            if run["id"] in missing:
+                found[run["id"]] = run
+                missing.discard(run["id"])
+        # runs are listed newest first, later pages can't hold ids newer than this one
+        if not runs or not missing or min(missing) >= min(r["id"] for r in runs):
+            break
+        page = result.get("next_page")
+    return found
+
+def cached_graph(main_app, data):
+    key = (main_app, hashlib.sha1(data.encode()).hexdigest(), graph.LAYOUT_VERSION)
+    return graph_cache.get("graph", key, lambda: graph.calculate_graph(main_app, data))
+
+@app.on_event("startup")
+async def provision_tables():
+    # tables added since a deployment was first set up, e.g. TeamDashboard
+    await async_util.dynamo(dynamo_util.ensure_tables_exist)
+
 @app.get("/")
 async def read_root():
     return {"message": "Hello World"}
 
 @app.get("/get_teams")
 async def get_teams():
-    result = dynamo_util.get_teams()
+    result = await read_cache.get_async("teams", None, lambda: async_util.dynamo(dynamo_util.get_teams))
+    if result is None:
+        raise HTTPException(status_code=503, detail="Failed to read teams")
     return {"teams": result}
 
 @app.get("/get_app")
 async def get_app(app_name: str = "app_name"):
     print("##", app_name)
-    result = dynamo_util.get_app(app_name)
+    result = await read_cache.get_async("app", app_name, lambda: async_util.dynamo(dynamo_util.get_app, app_name))
     print("###", result)
     return {"app": result}
 
 @app.get("/get_apps")
 async def get_apps(team_id: int = "team_id"):
-    result = dynamo_util.get_apps(team_id)
+    result = await read_cache.get_async("apps", team_id, lambda: async_util.dynamo(dynamo_util.get_apps, team_id))
+    if result is None:
+        raise HTTPException(status_code=503, detail="Failed to read apps")
     return {"apps": result}
 
 @app.get("/get_app_versions")
-async def get_apps_versions(app: str = "app1"):
-    app_versions = dynamo_util.get_app_versions(app)
+async def get_apps_versions(app: str = "app1", limit: Optional[int] = None, cursor: Optional[int] = None):
+    repo_url = f"https://github.com/hugh-nguyen/{app}-cortex-command"
+    workflow_name = "create-manifest-and-deploy"
+    if limit:
+        # newest first, pass next_cursor back as cursor for the following page
+        read_versions = async_util.dynamo(dynamo_util.get_app_versions_page, app, limit, cursor)
+    else:
+        read_versions = async_util.dynamo(lambda: (dynamo_util.get_app_versions(app), None))
+    (app_versions, next_cursor), workflow_runs = await asyncio.gather(
+        read_versions,
+        watched_workflow_runs(repo_url, workflow_name),
+    )
+    # graphs are laid out at deploy time, only versions stored before that
+    # or with an older layout are computed here and written back
+    stale = [av for av in app_versions if av.get("graph_layout") != graph.LAYOUT_VERSION or not av.get("graph")]
+    # a miss lays the graph out, which is CPU bound, keep it off the event loop
+    graphs = await asyncio.gather(*[asyncio.to_thread(cached_graph, av["app_name"], av["yaml"]) for av in stale])
+    for av, graph_data in zip(stale, graphs):
+        av["graph"] = graph_data
+    await asyncio.gather(*[
+        async_util.dynamo(dynamo_util.put_app_version_graph, av["app_name"], av["version"], av["graph"], graph.LAYOUT_VERSION)
+        for av in stale
+    ], return_exceptions=True)
+    
     transform = lambda av: {
       "app": av["app_name"],
       "version": av["version"],
-      "graph": graph.calculate_graph(av["app_name"], av["yaml"]),
-      "run_id": av["run_id"],
+      "graph": av["graph"],
+      "run_id": int(av["run_id"]) if av.get("run_id") else None,
     }
     app_versions = {int(av["version"]): transform(av) for av in app_versions}
     print("!!!", len(app_versions))
     
-    repo_url = f"https://github.com/hugh-nguyen/{app}-cortex-command"
-    workflow_name = "create-manifest-and-deploy"
-    runs = git_util.get_workflow_runs(repo_url, workflow_name)["workflow_runs"]
+    runs = workflow_runs["workflow_runs"]
     lookup = {r["id"]: r for r in runs}
+    if limit:
+        # older pages deployed before the runs on GitHub's first page
+        missing = [av["run_id"] for av in app_versions.values() if av["run_id"] and av["run_id"] not in lookup]
+        if missing:
+            try:
+                lookup.update(await async_util.github(find_workflow_runs, repo_url, workflow_name, missing))
+            except Exception as e:
+                print(f"Error listing runs of {repo_url}: {str(e)}")
+        # only runs the list pages didn't reach, e.g. past RUNS_MAX_PAGES, are fetched by id
+        missing = [run_id for run_id in missing if run_id not in lookup]
+        fetched, _ = await async_util.fan_out("github", cached_workflow_run, missing, repo_url, limit=4, timeout=FAN_OUT_TIMEOUT)
+        lookup.update(fetched)
     
     app_versions = {k: {**av, "run": lookup.get(av["run_id"])} for k, av in app_versions.items() if "run_id" in av}
     print("!!!!!!", len(app_versions))  
@@ -70,7 +228,7 @@ async def get_apps_versions(app: str = "app1"):
     deploying_runs = [r for r in runs if 
                      (r["status"] == "in_progress" or r["status"] == "queued" or r["status"] == "waiting")]
     
-    if deploying_runs:
+    if deploying_runs and cursor is None:
         newest_deploying = sorted(deploying_runs, key=lambda r: r["created_at"], reverse=True)[0]
         
         app_versions["deploying"] = {
@@ -81,23 +239,40 @@ async def get_apps_versions(app: str = "app1"):
             "is_deploying": True
         }
     
-    return {"app_versions": app_versions}
+    return {"app_versions": app_versions, "next_cursor": next_cursor}
 
 @app.get("/get_routes")
 async def get_routes(team_id: int = "team_id"):
-    result = dynamo_util.get_routes(team_id)
+    result = await read_cache.get_async("routes", team_id, lambda: async_util.dynamo(dynamo_util.get_routes, team_id))
     return {"routes": result}
 
 @app.put("/put_route")
 async def put_route(payload: Dict[str, Any] = Body(...)):
     print(payload)
-    result = dynamo_util.put_route(payload)
+    result = await async_util.dynamo(dynamo_util.put_route, payload)
+    read_cache.invalidate("routes")
     return {"routes": result}
 
 @app.get("/update_envoy")
-async def update_envoy():
-    envoy_util.update_envoy()
-    return {"result": "SUCCESS"}
+async def update_envoy(wait: bool = False, force: bool = False):
+    # deploys call this right after uploading the new app and app version
+    read_cache.invalidate("apps", "app", "dashboard")
+    # the deploy wrote its services from another process, so a re-registered
+    # service would otherwise keep its old address until SERVICES_TTL
+    dynamo_util.invalidate_services()
+    # force re-pushes an unchanged route table, a request without it doesn't cancel another's
+    job = envoy_trigger.request(**({"force": True} if force else {}))
+    if wait:
+        job = await asyncio.to_thread(envoy_trigger.wait, job["job_id"], 300)
+    return {"result": "ACCEPTED", "job_id": job["job_id"], "job": job}
+
+@app.get("/get_cache_stats")
+async def get_cache_stats():
+    return {"cache": {**read_cache.get_stats(), **graph_cache.get_stats()}}
+
+@app.get("/get_update_envoy_status")
+async def get_update_envoy_status(job_id: str):
+    return {"job": envoy_trigger.get(job_id)}
 
 @app.get("/hello/{name}")
 async def read_hello(name: str):
@@ -115,79 +290,128 @@ async def test_apps():
         
 @app.get("/deploy_app_version")
 async def deploy_app_version(app_name: str, command_repo: str):
-    return git_util.run_workflow(command_repo, "create-manifest-and-deploy")
+    result = await async_util.github(git_util.run_workflow, command_repo, "create-manifest-and-deploy")
+    # don't let an idle watcher wait out its interval before it sees the new run
+    run_watcher.refresh(command_repo)
+    read_cache.invalidate("workflow_runs")
+    return result
+
+def paged_runs(result):
+    # results are shared through read_cache, answer with a copy
+    result = dict(result)
+    if "next_page" in result:
+        result["next_cursor"] = result.pop("next_page")
+    return result
 
 @app.get("/get_workflow_runs")
-async def get_workflow_runs(app_name: str, repo_url: str, workflow_name: str = "create-manifest-and-deploy", mode: str = "builds"):
-    result = git_util.get_workflow_runs(repo_url, workflow_name)
-    
+async def get_workflow_runs(app_name: str, repo_url: str, workflow_name: str = "create-manifest-and-deploy", mode: str = "builds",
+                            limit: Optional[int] = None, cursor: Optional[int] = None):
+    # limit is GitHub's per_page (at most 100), cursor the next_cursor of the previous page
+    list_runs = lambda: listed_workflow_runs(repo_url, workflow_name, limit, cursor)
     if mode == "builds":
-        return result
+        return paged_runs(await list_runs())
     
-    app_versions = dynamo_util.get_app_versions(app_name)
-    lookup = {av["run_id"]: av["version"] for av in app_versions if "run_id" in av}
+    result, app_versions = await asyncio.gather(
+        list_runs(),
+        async_util.dynamo(lambda: list(dynamo_util.iter_app_versions(app_name, 'summary'))),
+    )
+    lookup = {int(av["run_id"]): av["version"] for av in app_versions if "run_id" in av}
     
+    result = paged_runs(result)
     result["workflow_runs"] = [{**r, "app_version": lookup.get(r["id"])} for r in result["workflow_runs"]]
     return result
 
 @app.get("/get_app_dashboard_data")
 async def get_app_dashboard_data(team_id: int):
+    return await read_cache.get_async(
+        "dashboard", team_id, lambda: team_dashboard(team_id),
+        keep=lambda dashboard: not dashboard.get("errors"),
+    )
+
+def read_app_versions(app_name, profile):
+    # unlike dynamo_util.get_app_versions2 this raises, so fan_out can report the app as failed
+    return list(dynamo_util.iter_app_versions(app_name, profile))
+
+async def team_dashboard(team_id):
+    apps = await async_util.dynamo(dynamo_util.get_apps, team_id)
+    if apps is None:
+        raise HTTPException(status_code=503, detail="Failed to read apps")
+    app_versions, missing = await async_util.dynamo(dynamo_util.get_team_dashboard_versions, team_id, apps)
     
-    apps = [a for a in dynamo_util.get_apps(team_id)]
-    app_versions = []
-    for app in apps:
-        app_versions += dynamo_util.get_app_versions2(app["name"])
-    
-    
-    
-    dependency_graph = {}
-    services = set()
-    for av in app_versions:
-        
-        lookup = {f"{s['app']}/{s['svc']}": s['svc_ver'] for s in av["services"] + av["dependencies"]}
-        services = services.union(set(lookup.keys()))
-        
-        for link in av["links"]:
-            base_key = f"{link['source']['app']}/{link['source']['svc']}"
-            source_key = f"{base_key}@{lookup[base_key]}"
-            
-            base_key = f"{link['target']['app']}/{link['target']['svc']}"
-            target_key = f"{base_key}@{lookup[base_key]}"
-            
-            if source_key not in dependency_graph:
-                dependency_graph[source_key] = []
-            
-            graph_link = {
-                "target": target_key,
-                "appVersion": av["version"]
-            }
-            dependency_graph[source_key].append(graph_link)
-    
-    return {
-        "apps": apps,
-        "app_versions": app_versions,
-        "dependency_graph": dependency_graph,
-        "services": services,
-    }
+    # apps with versions stored before TeamDashboard existed (see manual/build_team_dashboard.py)
+    versions, errors = await async_util.fan_out(
+        "dynamo", read_app_versions, missing, 'graph',
+        timeout=FAN_OUT_TIMEOUT,
+    )
+    app_versions += [av for fallback in versions.values() for av in fallback]
+    dashboard = dynamo_util.build_dashboard(apps, app_versions)
+    if errors:
+        # partial: apps listed in errors are missing their versions
+        dashboard["errors"] = errors
+    return dashboard
 
 @app.get("/get_incomplete_runs")
 async def get_incomplete_runs(app: str):
     
     repo_url = f"https://github.com/hugh-nguyen/{app}-cortex-command"
     workflow_name = "create-manifest-and-deploy"
-    runs = git_util.get_workflow_runs(repo_url, workflow_name)["workflow_runs"]
-    lookup = {r["id"]: r for r in runs}
-    
-    condition = lambda r: (r["status"] == "in_progress" or r["status"] == "queued" or r["status"] == "waiting")
-    incomplete_runs = [r for r in runs if condition(r)]
+    runs = (await watched_workflow_runs(repo_url, workflow_name))["workflow_runs"]
     
     return {
-        "incomplete_runs": incomplete_runs
+        "incomplete_runs": status_util.incomplete_runs(runs)
     }
+
+@app.get("/subscribe_runs")
+async def subscribe_runs(request: Request, app: str, workflow_name: str = "create-manifest-and-deploy"):
+    """
+    Server-sent events with {"workflow_runs", "incomplete_runs"} for the app's
+    command repo, sent on connect and whenever a run starts or changes status
+    """
+    repo_url = f"https://github.com/hugh-nguyen/{app}-cortex-command"
+    queue = run_watcher.subscribe(repo_url, workflow_name)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                    yield f"data: {json.dumps(snapshot)}\n\n"
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # comment line, keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            run_watcher.unsubscribe(repo_url, workflow_name, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/github_webhook")
+async def github_webhook(request: Request):
+    """
+    Receiver for GitHub workflow_run webhooks, wakes the watcher of the repo
+    so subscribers hear about a run without waiting for the next poll
+    """
+    body = await request.body()
+    secret = os.environ.get("GITHUB_WEBHOOK_SECRET")
+    if secret:
+        expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, request.headers.get("x-hub-signature-256", "")):
+            raise HTTPException(status_code=401, detail="Invalid signature")
+
+    if request.headers.get("x-github-event") == "workflow_run":
+        try:
+            repo_url = json.loads(body).get("repository", {}).get("html_url")
+        except (ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Invalid webhook payload")
+        if repo_url:
+            run_watcher.refresh(repo_url)
+            read_cache.invalidate("workflow_runs")
+    return {"status": "ok"}
     
 
 @app.get("/get_service")
 async def get_service_endpoint(full_name: str):
     return {
-        "service": dynamo_util.get_service(full_name)
+        "service": await async_util.dynamo(dynamo_util.get_service, full_name)
     }
\ No newline at end of file
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+INCOMPLETE_STATUSES = ("in_progress", "queued", "waiting")
+
+
+def incomplete_runs(runs):
+    return [r for r in runs if r["status"] in INCOMPLETE_STATUSES]
+
+
+class RunWatcher:
+    """
+    One shared poller per (repo_url, workflow_name) that pushes workflow run
+    changes to every subscribed client, so GitHub traffic grows with the
+    number of repos being watched rather than the number of open tabs.
+
+    A poller starts with its first subscriber and stops after its last one
+    leaves. It polls every `interval` seconds while a run is in flight and
+    every `idle_interval` seconds otherwise; `refresh` (e.g. from a webhook)
+    wakes it up straight away.
+    """
+
+    def __init__(self, fetch, interval=5.0, idle_interval=30.0, max_queue=10):
+        self.fetch = fetch
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.max_queue = max_queue
+        self.watches = {}
+
+    def latest(self, repo_url, workflow_name, max_age=None):
+        """
+        Last snapshot the poller of this repo published, or None if nobody
+        is watching it or it is older than max_age seconds. max_age defaults
+        to twice the interval the poller is currently waiting, so a snapshot
+        is accepted for as long as the poller keeps it up to date.
+        """
+        watch = self.watches.get((repo_url, workflow_name))
+        if not watch or watch["snapshot"] is None:
+            return None
+        if max_age is None:
+            max_age = 2 * watch["interval"]
+        if time.monotonic() - watch["fetched_at"] > max_age:
+            return None
+        return watch["snapshot"]
+
+    def subscribe(self, repo_url, workflow_name):
+        """
+        Register a client for the runs of a repo, starting its poller if
+        nobody watched it yet. The returned queue receives the current
+        snapshot, if there is one, and then every snapshot in which a run
+        was added or changed status. Pass it to unsubscribe when done.
+        """
+        key = (repo_url, workflow_name)
+        watch = self.watches.get(key)
+        if watch is None:
+            watch = self.watches[key] = {
+                "subscribers": set(),
+                "snapshot": None,
+                "fetched_at": None,
+                "interval": self.interval,
+                "wake": asyncio.Event(),
+            }
+            watch["task"] = asyncio.create_task(self._poll(key, watch))
+
+        queue = asyncio.Queue(self.max_queue)
+        watch["subscribers"].add(queue)
+        if watch["snapshot"] is not None:
+            queue.put_nowait(watch["snapshot"])
+        return queue
+
+    def unsubscribe(self, repo_url, workflow_name, queue):
+        key = (repo_url, workflow_name)
+        watch = self.watches.get(key)
+        if watch is None:
+            return
+        watch["subscribers"].discard(queue)
+        if not watch["subscribers"]:
+            watch["task"].cancel()
+            del self.watches[key]
+
+    def refresh(self, repo_url=None):
+        """
+        Poll now instead of waiting for the next interval, for every watched
+        repo or only those of repo_url
+        """
+        for (watched_url, _), watch in self.watches.items():
+            if repo_url is None or watched_url.rstrip("/").lower() == repo_url.rstrip("/").lower():
+                watch["wake"].set()
+
+    async def _poll(self, key, watch):
+        fingerprint = None
+        while True:
+            try:
+                result = await self.fetch(*key)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+
+            if "workflow_runs" in result:
+                runs = result["workflow_runs"]
+                snapshot = {"workflow_runs": runs, "incomplete_runs": incomplete_runs(runs)}
+                watch["fetched_at"] = time.monotonic()
+                current = json.dumps([(r["id"], r["status"], r["conclusion"]) for r in runs])
+                if current != fingerprint:
+                    fingerprint = current
+                    watch["snapshot"] = snapshot
+                    self._publish(watch, snapshot)
+            else:
+                print(f"Error watching {key[0]}: {result.get('message')}")
+
+            in_flight = watch["snapshot"] and watch["snapshot"]["incomplete_runs"]
+            watch["interval"] = self.interval if in_flight else self.idle_interval
+            try:
+                await asyncio.wait_for(watch["wake"].wait(), watch["interval"])
+            except asyncio.TimeoutError:
+                pass
+            watch["wake"].clear()
+
+    def _publish(self, watch, snapshot):
+        for queue in watch["subscribers"]:
+            if queue.full():
+                # a slow client only needs the newest state, drop what it hasn't read
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class CoalescingTrigger:
+    """
+    Single-flight, debounced runner for an expensive job such as update_envoy.
+
+    Requests that arrive within `debounce` seconds of the first one share a
+    single job. A request made while a job is running queues exactly one
+    follow-up job, so changes made mid-run are still picked up without
+    stacking N overlapping runs. Keyword arguments of every request that
+    shares a job are merged and passed to fn.
+
+    Jobs run one after another on a single worker thread that is started
+    with the first request and kept, so anything fn keeps per thread (such
+    as dynamo_util's boto3 resources) is built once rather than per job.
+    """
+
+    def __init__(self, fn, debounce=2.0, max_jobs=100):
+        self.fn = fn
+        self.debounce = debounce
+        self.max_jobs = max_jobs
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.events = {}
+        self.pending = None
+        self.running = None
+        self.wakeup = threading.Condition(self.lock)
+        self.worker = None
+
+    def request(self, **kwargs):
+        with self.lock:
+            if self.pending is None:
+                self.pending = self._new_job()
+                self._start_worker()
+                self.wakeup.notify()
+            self.pending["requests"] += 1
+            self.pending["kwargs"].update(kwargs)
+            return dict(self.pending)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, timeout=None):
+        event = self.events.get(job_id)
+        if event:
+            event.wait(timeout)
+        return self.get(job_id)
+
+    def _new_job(self):
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "requests": 0,
+            "kwargs": {},
+            "requested_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job["job_id"]] = job
+        self.events[job["job_id"]] = threading.Event()
+        while len(self.jobs) > self.max_jobs:
+            old_id, _ = self.jobs.popitem(last=False)
+            self.events.pop(old_id, None)
+        return job
+
+    def _start_worker(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._work, daemon=True)
+            self.worker.start()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while self.pending is None:
+                    self.wakeup.wait()
+            # a job queued mid-run also waits out the debounce after that run
+            time.sleep(self.debounce)
+            self._run()
+
+    def _run(self):
+        with self.lock:
+            job, self.pending, self.running = self.pending, None, self.pending
+            job["status"] = "running"
+            job["started_at"] = time.time()
+
+        try:
+            result = self.fn(**job["kwargs"])
+            status, error = "succeeded", None
+        except Exception as e:
+            print(f"Error in {job['job_id']}: {str(e)}")
+            result, status, error = None, "failed", str(e)
+
+        with self.lock:
+            job.update(status=status, result=result, error=error, finished_at=time.time())
+            self.running = None
+            event = self.events.get(job["job_id"])
+        if event:
+            event.set()
@@ -47,7 +47,10 @@ interface GlobalContextType {
   selectedAppVersion: VersionData | null;
   setSelectedAppVersion: (version: VersionData | null) => void;
   appVersions: AppVersions | null;
-  setAppVersions: (versions: AppVersions | null) => void;
+  setAppVersions: React.Dispatch<React.SetStateAction<AppVersions | null>>;
+  // cursor of the next, older page of appVersions, null once every version is loaded
+  appVersionsCursor: number | null;
+  setAppVersionsCursor: (cursor: number | null) => void;
 
   routes: Route[];  
   setRoutes: (routes: Route[]) => void;
@@ -120,6 +123,7 @@ export const GlobalProvider: React.FC<{ children: React.ReactNode }> = ({ childr
 
   const [selectedAppVersion, setSelectedAppVersion] = useState<VersionData | null>(null);
   const [appVersions, setAppVersions] = useState<AppVersions | null>(null);
+  const [appVersionsCursor, setAppVersionsCursor] = useState<number | null>(null);
 
   const [graphData, setGraphData] = useState<GraphData | null>(null);
 
@@ -142,7 +146,7 @@ export const GlobalProvider: React.FC<{ children: React.ReactNode }> = ({ childr
     pathname, teams, router, setAppVersions, setLoading, 
     setError, setSelectedTeam, setSelectedAppVersion, setSubModule,
     setRoutes, selectedTeam, setSelectedApp, appVersions, setPath, path,
-    selectedApp
+    selectedApp, setAppVersionsCursor
   )
   selectedTeamEffect(selectedTeam, setLoading, setError, setApps)
   pathNameSelectedAppEffect(pathname, selectedApp, router, selectedTeam)
@@ -167,6 +171,8 @@ export const GlobalProvider: React.FC<{ children: React.ReactNode }> = ({ childr
       selectedAppVersion,
       appVersions,
       setAppVersions,
+      appVersionsCursor,
+      setAppVersionsCursor,
       setSelectedAppVersion,
 
       routes,
@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import { 
   Box, 
   Card, 
@@ -111,7 +111,7 @@ const AppDashboard: React.FC = () => {
   const [deploymentLoading, setDeploymentLoading] = useState(false);
   const [deploymentMessage, setDeploymentMessage] = useState("Preparing to deploy new version...");
   const [deploymentStartTime, setDeploymentStartTime] = useState<number | null>(null);
-  const pollingRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const runsSourceRef = useRef<EventSource | null>(null);
 
   const appNames = Array.from(new Set(apps.map(a => a.App.split('/')[0]))).sort();
 
@@ -139,40 +139,43 @@ const AppDashboard: React.FC = () => {
     setSnackbarOpen(false);
   };
 
-  const poll = async () => {
+  const subscribeRuns = () => {
     if (!selectedApp) return;
-  
-    try {
-      const res = await fetch(
-        `http://localhost:8000/get_incomplete_runs?app=${selectedApp.App}`
-      );
-      const data = await res.json();
-  
-      if (data.incomplete_runs.length === 0) {
+
+    if (runsSourceRef.current) {
+      runsSourceRef.current.close();
+    }
+
+    // the backend pushes run changes from one shared GitHub poller, no need to poll it from every tab
+    const source = new EventSource(
+      `http://localhost:8000/subscribe_runs?app=${selectedApp.App}`
+    );
+    let seenInFlight = false;
+
+    source.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+
+      if (data.incomplete_runs.length > 0) {
+        seenInFlight = true;
+      } else if (seenInFlight) {
         console.log('done');
-        if (pollingRef.current) {
-          clearInterval(pollingRef.current);
-          pollingRef.current = null;
-        }
+        source.close();
+        runsSourceRef.current = null;
       }
-  
-      console.log('###', data.incomplete_runs);
 
       setIncompleteRuns(data.incomplete_runs)
-    } catch (err) {
-      console.error('Error polling:', err);
-    }
-  };
-  
+    };
+    source.onerror = (err) => {
+      console.error('Error in run subscription:', err);
+    };
 
-  const startPolling = () => {
-    if (pollingRef.current) {
-      clearInterval(pollingRef.current);
-    }
-  
-    pollingRef.current = setInterval(poll, 5000);
+    runsSourceRef.current = source;
   };
 
+  useEffect(() => {
+    return () => runsSourceRef.current?.close();
+  }, []);
+
   const handleDeployNewVersionClick = async () => {
     if (!selectedApp?.CommandRepoURL) {
       setSnackbarMessage("No repository URL found for this application");
@@ -211,8 +214,7 @@ const AppDashboard: React.FC = () => {
         
         setTimeout(() => {
           setDeploymentLoading(false);
-          poll();
-          startPolling();
+          subscribeRuns();
         }, 2500);
       } else {
         throw new Error(data.message || "Failed to trigger GitHub Action");
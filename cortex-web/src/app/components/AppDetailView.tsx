@@ -20,6 +20,7 @@ import { purple, grey, orange } from '@mui/material/colors';
 import dynamic from 'next/dynamic';
 import { usePathname, useRouter } from 'next/navigation';
 import { useGlobal } from '@/app/GlobalContext';
+import { fetchMoreAppVersions, APP_VERSIONS_PAGE_SIZE } from '@/app/utils/fetch';
 import GitHubIcon from '@mui/icons-material/GitHub';
 import RocketLaunchIcon from '@mui/icons-material/RocketLaunch';
 import RefreshIcon from '@mui/icons-material/Refresh';
@@ -97,7 +98,8 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
     selectedTeam,
     loading, error, appVersions, 
     selectedAppVersion, setSelectedAppVersion, 
-    graphData, setGraphData, selectedApp, setAppVersions
+    graphData, setGraphData, selectedApp, setAppVersions,
+    appVersionsCursor, setAppVersionsCursor
   } = useGlobal();
   const router = useRouter();
   const [graphKey, setGraphKey] = useState(0);
@@ -112,16 +114,17 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
   const [workflowsLoading, setWorkflowsLoading] = useState(false);
   const [workflowsError, setWorkflowsError] = useState<string | null>(null);
   // const [versionsPollingInterval, setVersionsPollingInterval] = useState<NodeJS.Timeout | null>(null);
-  const [versionsPollingInterval, setVersionsPollingInterval] = useState<NodeJS.Timeout | null>(null);
+  const [awaitingDeploy, setAwaitingDeploy] = useState(false);
+  const [runsUpdate, setRunsUpdate] = useState(0);
   const versionsIntervalRef = useRef<NodeJS.Timeout | null>(null);
+  const [loadingMoreVersions, setLoadingMoreVersions] = useState(false);
+  const [moreVersionsError, setMoreVersionsError] = useState<string | null>(null);
 
   const defaultModule = "team";
   const defaultSubModule = "applications";
 
   const pathname = usePathname();
   
-  // Polling interval in milliseconds (5 seconds)
-  const POLLING_INTERVAL = 5000;
   let activePollingInterval: NodeJS.Timeout | null = null;
 
   // Handler functions...
@@ -155,6 +158,33 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
     }
   };
 
+  const loadMoreVersions = async () => {
+    if (!selectedApp || appVersionsCursor === null || loadingMoreVersions) return;
+    
+    setLoadingMoreVersions(true);
+    await fetchMoreAppVersions(
+      selectedApp.App, APP_VERSIONS_PAGE_SIZE, appVersionsCursor,
+      setAppVersions, setAppVersionsCursor, setMoreVersionsError
+    );
+    setLoadingMoreVersions(false);
+  };
+
+  const handleVersionsScroll = (event: React.UIEvent<HTMLElement>) => {
+    const { scrollTop, clientHeight, scrollHeight } = event.currentTarget;
+    if (scrollTop + clientHeight >= scrollHeight - 50) {
+      loadMoreVersions();
+    }
+  };
+
+  // a link to an older version than the first page holds keeps loading pages until it's there
+  useEffect(() => {
+    const parts = pathname.split("/");
+    const versionNumber = Number(parts[parts.length - 1]);
+    if (appVersions && versionNumber && !appVersions[versionNumber] && appVersionsCursor !== null && !moreVersionsError) {
+      loadMoreVersions();
+    }
+  }, [appVersions, appVersionsCursor, loadingMoreVersions]);
+
   const handleBackClick = () => {
     // if (onBack) {
     //   onBack();
@@ -192,9 +222,20 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
   //     }
   //   };
   // }, [versionsPollingInterval]);
+  // the backend pushes run changes from one shared GitHub poller, no need to poll it from every tab
   useEffect(() => {
-    console.log('versionsPollingInterval changed to', versionsPollingInterval);
-  }, [versionsPollingInterval]);
+    if (!selectedApp) return;
+
+    const source = new EventSource(
+      `http://localhost:8000/subscribe_runs?app=${selectedApp.App}`
+    );
+    source.onmessage = () => setRunsUpdate((count) => count + 1);
+    source.onerror = (err) => {
+      console.error('Error in run subscription:', err);
+    };
+
+    return () => source.close();
+  }, [selectedApp]);
 
   const finishDeployment = () => {
     setDeploymentMessage("Deployment successful! Opening GitHub Actions...");
@@ -249,19 +290,18 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
     }
   };
 
+  // a run started or changed status
   useEffect(() => {
-    const hasInProgressRuns = workflowRuns.some(
-      run => run.status === 'in_progress' || run.status === 'queued' || run.status === 'waiting'
-    );
-    
-    if (activeTab === 'deployments' && hasInProgressRuns) {
-      const intervalId = setInterval(() => {
-        fetchWorkflowRuns();
-      }, POLLING_INTERVAL);
-      
-      return () => clearInterval(intervalId);
+    if (!runsUpdate) return;
+
+    if (activeTab === 'deployments') {
+      fetchWorkflowRuns();
     }
-  }, [workflowRuns, activeTab]);
+    // until the new version is stored, any run change may be the one that finished it
+    if (awaitingDeploy) {
+      refreshAppVersions();
+    }
+  }, [runsUpdate]);
 
   useEffect(() => {
     if (activeTab === 'deployments' && selectedApp) {
@@ -273,7 +313,7 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
     if (!selectedApp) return;
     
     try {
-      const response = await fetch(`http://localhost:8000/get_app_versions?app=${selectedApp.App}`);
+      const response = await fetch(`http://localhost:8000/get_app_versions?app=${selectedApp.App}&limit=${APP_VERSIONS_PAGE_SIZE}`);
       if (!response.ok) {
         throw new Error(`Failed to fetch app versions: ${response.status}`);
       }
@@ -281,7 +321,11 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
       const data = await response.json();
       
       if (data.app_versions) {
-        setAppVersions(data.app_versions);
+        // the newest page replaces what it overlaps, older pages already loaded are kept
+        setAppVersions((loaded) => ({
+          ...Object.fromEntries(Object.entries(loaded || {}).filter(([key]) => key !== "deploying")),
+          ...data.app_versions,
+        }));
         
         if (data.app_versions.deploying) {
           setSelectedAppVersion(data.app_versions.deploying);
@@ -292,8 +336,9 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
           console.log(versionNumber)
           console.log(versionNumber+1)
           console.log(parts.slice(0, -1).join("/") + "/" + (versionNumber+1))
-          console.log(versionNumber, Object.keys(data.app_versions).length)
-          if (Object.keys(data.app_versions).length > versionNumber) {
+          const newestVersion = Math.max(...Object.keys(data.app_versions).map(Number).filter(v => !isNaN(v)));
+          console.log(versionNumber, newestVersion)
+          if (newestVersion > versionNumber) {
             window.location.href = parts.slice(0, -1).join("/") + "/" + (versionNumber+1)
           } else {
             window.location.reload()
@@ -305,18 +350,9 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
     }
   };
   
-  const startVersionsPolling = () => {
-    // Clear any existing interval
-    if (versionsPollingInterval) {
-      clearInterval(versionsPollingInterval);
-    }
-    
-    // Set a new polling interval - 5 seconds
-    const interval = setInterval(() => {
-      refreshAppVersions();
-    }, 5000);
-
-    setVersionsPollingInterval(interval);
+  const awaitNewVersion = () => {
+    // refreshed on run changes from the subscription instead of on an interval
+    setAwaitingDeploy(true);
   };
 
   // const startVersionsPolling = () => {
@@ -404,8 +440,8 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
           // Instead, refresh the versions list to see the new "deploying" version
           refreshAppVersions();
           
-          // Set a polling interval to refresh versions until the real one appears
-          startVersionsPolling();
+          // Refresh versions on every run change until the real one appears
+          awaitNewVersion();
         }, 2500);
       } else {
         throw new Error(data.message || "Failed to trigger GitHub Action");
@@ -533,10 +569,12 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
                 borderRight: '1px solid #E0E0E0',
                 display: 'flex',
                 flexDirection: 'column',
+                overflowY: 'auto',
                 m: 0,
                 borderRadius: 0
               }}
               elevation={0}
+              onScroll={handleVersionsScroll}
             >
               <Box sx={{ p: 2 }}>
                 <Typography 
@@ -612,6 +650,20 @@ const AppDetailView: React.FC<AppDetailViewProps> = ({
                         );
                       })
                   }
+                  {appVersionsCursor !== null && (
+                    <ListItem disablePadding>
+                      <ListItemButton onClick={loadMoreVersions} disabled={loadingMoreVersions} sx={{ padding: '4px', pl: 2 }}>
+                        {loadingMoreVersions ? (
+                          <CircularProgress size={16} />
+                        ) : (
+                          <ListItemText
+                            primary={moreVersionsError ? "Retry loading" : "Load more"}
+                            primaryTypographyProps={{ sx: { color: grey[600], fontSize: '0.85rem' } }}
+                          />
+                        )}
+                      </ListItemButton>
+                    </ListItem>
+                  )}
                 </List>
               )}
             </Box>
@@ -81,6 +81,7 @@ export function pathNameTeamsEffect(
   setPath: any,
   path: any,
   selectedApp: any,
+  setAppVersionsCursor: any,
 ) {
   useEffect(() => {
     console.log(1, pathname, path, pathname != path)
@@ -115,7 +116,7 @@ export function pathNameTeamsEffect(
             console.log(appVersions, selectedApp?.App, appName)
             if (!appVersions || (selectedApp?.App !== appName)) {
               console.log("fetchingApps")
-              fetchAppVersions(appName, setAppVersions, setLoading, setError)
+              fetchAppVersions(appName, setAppVersions, setLoading, setError, setAppVersionsCursor)
             }
             fetchApp(appName, setSelectedApp, setLoading, setError)
           }
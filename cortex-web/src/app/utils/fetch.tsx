@@ -43,10 +43,13 @@ export const fetchApp = async (appName: string, setSelectedApp: any, setLoading:
     }
 }
 
-export const fetchAppVersions = async (appName: string, setAppVersions: any, setLoading: any, setError: any) => {
+// versions listed per request, older ones are loaded with fetchMoreAppVersions
+export const APP_VERSIONS_PAGE_SIZE = 20;
+
+export const fetchAppVersions = async (appName: string, setAppVersions: any, setLoading: any, setError: any, setCursor: any) => {
     try {
         setLoading(true);
-        const response = await fetch(`http://127.0.0.1:8000/get_app_versions?app=${appName}`);
+        const response = await fetch(`http://127.0.0.1:8000/get_app_versions?app=${appName}&limit=${APP_VERSIONS_PAGE_SIZE}`);
         
         if (!response.ok) {
             throw new Error(`API request failed with status ${response.status}`);
@@ -54,6 +57,7 @@ export const fetchAppVersions = async (appName: string, setAppVersions: any, set
         
         const data = await response.json();
         setAppVersions(data.app_versions)
+        setCursor(data.next_cursor)
         
         setError(null);
     } catch (err) {
@@ -64,6 +68,28 @@ export const fetchAppVersions = async (appName: string, setAppVersions: any, set
     }
 }
 
+export const fetchMoreAppVersions = async (appName: string, limit: number, cursor: number | null, setAppVersions: any, setCursor: any, setError: any) => {
+    try {
+        const params = new URLSearchParams({ app: appName, limit: String(limit) });
+        if (cursor !== null) params.set("cursor", String(cursor));
+        const response = await fetch(`http://127.0.0.1:8000/get_app_versions?${params}`);
+        
+        if (!response.ok) {
+            throw new Error(`API request failed with status ${response.status}`);
+        }
+        
+        const data = await response.json();
+        // pages come newest first, merge them into what is already loaded
+        setAppVersions((loaded: any) => ({ ...(cursor === null ? {} : loaded), ...data.app_versions }))
+        setCursor(data.next_cursor)
+        
+        setError(null);
+    } catch (err) {
+        console.error('Error fetching app versions:', err);
+        setError('Failed to load app versions. Please check the console for details.');
+    }
+}
+
 export const fetchRoutes = async (teamId: string, setRoutes: any, setLoading: any, setError: any) => {
     try {
         setLoading(true);
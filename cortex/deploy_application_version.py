@@ -1,59 +1,70 @@
 import yaml, os, subprocess, argparse, json, requests
 from cortex.util import *
 
-import boto3
 import json
 from datetime import datetime
+import cortex.dynamo_util
+import cortex.graph
 
 from cortex.deploy_kubernetes import deploy_kubernetes
 from cortex.deploy_serverless import deploy_serverless
 from cortex.deploy_mulesoft import deploy_mulesoft
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
-apps_table = dynamodb.Table('Apps')
-app_versions_table = dynamodb.Table('AppVersions')
-
-def upload_app(name=None, service_count=None, versions=None, team_id=None, command_url=None, services=None, dependencies=None, last_updated=None):
+def app_item(name=None, service_count=None, versions=None, team_id=None, command_url=None, services=None, dependencies=None, last_updated=None):
     if last_updated is None:
         last_updated = datetime.now().isoformat()
-        
-    response = apps_table.put_item(
-        Item={
-            'name': name,
-            'service_count': service_count,
-            'versions': versions,
-            'last_updated': last_updated,
-            'team_id': team_id,
-            "command_repo_url": command_url,
-            "services": services,
-            "dependencies": dependencies,
-        }
-    )
     
-    print(f"Uploaded app {name} to DynamoDB")
-    return response
+    return {
+        'name': name,
+        'service_count': service_count,
+        'versions': versions,
+        'last_updated': last_updated,
+        'team_id': team_id,
+        "command_repo_url": command_url,
+        "services": services,
+        "dependencies": dependencies,
+    }
 
 
-def upload_app_version(app_name="", version=None, yaml_data=None, service_count=None, change_count=None, run_id=None, services=None, dependencies=None, links=None):
-    response = app_versions_table.put_item(
-        Item={
-            'app_name': app_name,
-            'version': version,
-            'yaml': yaml_data,
-            'service_count': service_count,
-            'change_count': change_count,
-            'run_id': run_id,
-            "services": services,
-            "dependencies": dependencies,
-            "links": links,
-            'created_at': datetime.now().isoformat()
-        }
-    )
+def app_version_item(app_name="", version=None, yaml_data=None, service_count=None, change_count=None, run_id=None, services=None, dependencies=None, links=None, graph=None):
+    item = {
+        'app_name': app_name,
+        'version': version,
+        'yaml': yaml_data,
+        'service_count': service_count,
+        'change_count': change_count,
+        'run_id': run_id,
+        "services": services,
+        "dependencies": dependencies,
+        "links": links,
+        'created_at': datetime.now().isoformat()
+    }
+    if graph is not None:
+        # stored as JSON since DynamoDB won't take the float positions
+        item['graph'] = json.dumps(graph)
+        item['graph_layout'] = cortex.graph.LAYOUT_VERSION
+    return cortex.dynamo_util.encode_manifest(item)
+
+
+def upload_app(*args, **kwargs):
+    item = app_item(*args, **kwargs)
+    response = cortex.dynamo_util.get_table('apps').put_item(Item=item)
     
-    print(f"Uploaded version {version} of app {app_name} to DynamoDB")
+    print(f"Uploaded app {item['name']} to DynamoDB")
     return response
 
 
+def upload_app_version(*args, **kwargs):
+    item = app_version_item(*args, **kwargs)
+    cortex.dynamo_util.write_items([("app_versions", item)])
+    app = cortex.dynamo_util.get_app_by_name(item['app_name'])
+    if app and app.get('team_id') is not None:
+        cortex.dynamo_util.put_dashboard_version(app['team_id'], item)
+    
+    print(f"Uploaded version {item['version']} of app {item['app_name']} to DynamoDB")
+    return item
+
+
 def transform_routes(routes):
     result = []
     for route in routes:
@@ -97,6 +108,8 @@ def deploy_services(path_to_deploy_log, app_name, app_ver, run_id):
     
     print(os.listdir("temp/iac/"))
     
+    # registration is collected here and written in one transaction once every service is deployed
+    puts = []
     for platform in os.listdir("temp/iac/"):
         print(platform)
         if platform not in ("kubernetes", "serverless", "mulesoft"):
@@ -109,9 +122,9 @@ def deploy_services(path_to_deploy_log, app_name, app_ver, run_id):
             
             service = service_lookup[service_name]
             if platform == "kubernetes":
-                deploy_kubernetes(service, run_id)
+                puts.append(("services", deploy_kubernetes(service, run_id)))
             if platform == "serverless":
-                deploy_serverless(service, run_id)
+                puts.append(("services", deploy_serverless(service, run_id)))
             if platform == "mulesoft":
                 deploy_mulesoft(service)
 
@@ -122,18 +135,28 @@ def deploy_services(path_to_deploy_log, app_name, app_ver, run_id):
         "shared-app": 2,
     }
       
-    upload_app(
+    app = app_item(
         app_name, len(manifest["services"]), 
         app_ver, team_lookup[app_name],
         f"https://github.com/hugh-nguyen/{app_name}-cortex-command",
         [s["svc"] for s in manifest["services"]],
         [f"{d['app']}/{d['svc']}" for d in manifest["dependencies"]]
     )
-    upload_app_version(
+    app_version = app_version_item(
         app_name, app_ver, 
         raw_yaml, len(manifest["services"]), 0,
-        run_id, manifest["services"], manifest["dependencies"], manifest["links"]
+        run_id, manifest["services"], manifest["dependencies"], manifest["links"],
+        cortex.graph.calculate_graph(app_name, raw_yaml)
     )
+    service_count = len(puts)
+    puts += [
+        ("apps", app),
+        ("app_versions", app_version),
+    ]
+    cortex.dynamo_util.write_items(puts)
+    # after the transaction, the dashboard row must not be able to cancel a registration
+    cortex.dynamo_util.put_dashboard_version(app["team_id"], app_version)
+    print(f"Registered version {app_ver} of app {app_name} and {service_count} services in DynamoDB")
     
             
 def deploy_routes(path_to_deploy_log):
@@ -176,5 +199,16 @@ if __name__ == '__main__':
     if not args.testing:
         deploy_services(DEPLOY_LOG_PATH, app_name, app_ver, args.run_id)
     
-    import cortex.envoy_util
-    cortex.envoy_util.update_envoy()
\ No newline at end of file
+    update_envoy_url = os.environ.get("UPDATE_ENVOY_URL")
+    if update_envoy_url:
+        # let the backend coalesce route updates from concurrent deploys into one compile,
+        # waiting for the job so a failed push fails the deploy
+        response = requests.get(update_envoy_url, params={"wait": "true"}, timeout=330)
+        response.raise_for_status()
+        job = response.json()["job"]
+        print(job)
+        if job["status"] != "succeeded":
+            raise SystemExit(f"update_envoy job {job['job_id']} {job['status']}: {job['error']}")
+    else:
+        import cortex.envoy_util
+        cortex.envoy_util.update_envoy()
\ No newline at end of file
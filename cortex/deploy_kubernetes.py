@@ -32,9 +32,6 @@ def deploy_kubernetes(service, run_id):
             print(f"ERROR: Helm deployment failed:\n{error_message}")
             raise Exception(f"Helm deployment failed: {error_message}") from e
     
-    import boto3
-    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
-    services_table = dynamodb.Table('Services')
     links = [
         {
             "display_order": 0,
@@ -82,4 +79,5 @@ def deploy_kubernetes(service, run_id):
         "status": "Good",
         "platform": "kubernetes",
     }
-    services_table.put_item(Item=item)
\ No newline at end of file
+    # registered by deploy_services together with the app version
+    return item
\ No newline at end of file
@@ -53,9 +53,6 @@ def deploy_serverless(service, run_id):
             
     hostname = f"{api_id}.execute-api.ap-southeast-2.amazonaws.com"
             
-    import boto3
-    dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-2')
-    services_table = dynamodb.Table('Services')
     links = [
         {
             "display_order": 0,
@@ -111,5 +108,6 @@ def deploy_serverless(service, run_id):
         "rewrite": "/prod/",
         "platform": "serverless",
     }
-    services_table.put_item(Item=item)
+    # registered by deploy_services together with the app version
+    return item
     
\ No newline at end of file
@@ -1,118 +1,27 @@
 import yaml
 import requests
 import os
-from collections import defaultdict
+import json
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cortex.route_util import sort_routes
+import cortex.manifest_util
 import cortex.dynamo_util
 
-def env_route_sort_key(route):
-    # --- normalise headers into a dict --------------------------------------
-    header_map = {
-        (h.get("Name")  or h.get("name")):
-        (h.get("Value") or h.get("value"))
-        for h in route.get("headers", [])
-        if (h.get("Name") or h.get("name"))
-    }
-
-    header_cnt            = len(header_map)          # <-- NEW
-    app_name_sort_key     = header_map.get("X-App-Name", "zzzzzzzz")
-    app_version_sort_key  = int(header_map.get("X-App-Version", 99999999))
-
-    # --- headers_to_add (unchanged) -----------------------------------------
-    add_header_map = {
-        (h.get("Key")  or h.get("key")):
-        (h.get("Value") or h.get("value"))
-        for h in route.get("headers_to_add", [])
-        if (h.get("Key") or h.get("key"))
-    }
-    add_app_name_sort_key    = add_header_map.get("X-App-Name", "zzzzzzzz")
-    add_app_version_sort_key = int(add_header_map.get("X-App-Version", 99999999))
-    has_headers_to_add       = bool(add_header_map)
-
-    is_override = route.get("is_override", False)
-
-    # --------   the sort tuple   --------------------------------------------
-    return (
-        route["prefix"],        # 1) group by path
-        -header_cnt,            # 2) more header matchers → smaller (earlier)
-        app_name_sort_key,      # 3… same tie‑break rules as before
-        app_version_sort_key,
-        add_app_name_sort_key,
-        add_app_version_sort_key,
-        has_headers_to_add,
-        is_override,
-        route.get("cluster", "")
-    )
-
-def choose_route(routes):
-    most_recent = routes[0]
-    for r in routes:
-        if r.get("custom") == True:
-            return {k: v for k, v in r.items() if k != "custom"}
-        if "cluster" in r and r["cluster"] > most_recent["cluster"]:
-            most_recent = r
-    return most_recent
-
-def sort_routes(routes):
-    routes = set([yaml.dump(r, sort_keys=False) for r in routes])
-    routes = [yaml.safe_load(r) for r in routes]
-
-    groups = defaultdict(list)
-    for r in routes:
-        signature = r["prefix"]
-        if "headers" in r:
-            for h in r["headers"]:
-                signature += h["Value"] 
-        groups[signature].append(r)
-    
-    result = []
-    for k, group in groups.items():
-        result.append(choose_route(group))
-
-    return sorted(result, key=env_route_sort_key)
+CACHE_DIR = os.environ.get("CORTEX_CACHE_DIR", ".cortex-cache")
+COMPILE_CACHE_PATH = os.path.join(CACHE_DIR, "compile-cache.json")
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "route-snapshot.json")
+ENVOY_DELTA_URL = os.environ.get("ENVOY_DELTA_URL")
+# defaults to the /resources endpoint next to the routes url
+ENVOY_RESOURCES_URL = os.environ.get("ENVOY_RESOURCES_URL")
+MANIFEST_SOURCE = os.environ.get("MANIFEST_SOURCE", "github")
+CLUSTER_FIELDS = ("cluster", "address", "port", "cluster_type", "tls", "dn_lookup_family")
 
 def transform_headers(headers):
     return [{"Name": str(k), "Value": str(v)} for k, v in headers.items()]
 
 
-def request_get(url):
-    CERT_PATH = os.environ.get("CERT_PATH", None)
-    token = os.getenv("GH_PERSONAL_TOKEN")
-    headers = {"Accept": "application/vnd.github+json"}
-    headers["Authorization"] = f"token {token}"
-    if CERT_PATH:
-        return requests.get(url, headers=headers, verify=CERT_PATH)
-    return requests.get(url)
-
-
-def download_manifests(output_path, folder_path="app-version-manifests"):
-    
-    owner = "hugh-nguyen"
-    repo = "cortex-deploy-log"
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{folder_path}"
-    print(url)
-    
-    response = request_get(url)
-    if response.status_code == 200:
-        items = response.json()
-        os.makedirs(output_path, exist_ok=True)
-        for item in items:
-            if item["type"] == "file":
-                download_url = item["download_url"]
-                file_response = request_get(download_url)
-                if file_response.status_code == 200:
-                    file_path = os.path.join(output_path, item["name"])
-                    with open(file_path, "wb") as f:
-                        f.write(file_response.content)
-                    print(f"Downloaded {item['name']}")
-                else:
-                    print(f"Failed to download {item['name']}")
-            elif item["type"] == "dir":
-                sub_output_path = os.path.join(output_path, item["name"])
-                download_manifests(sub_output_path, folder_path=item["path"])
-    else:
-        print("Failed to retrieve folder contents")
-        print(response.text)
-
 def get_all_files(directory, suffix):
     file_list = []
     for root, dirs, files in os.walk(directory):
@@ -124,6 +33,88 @@ def get_all_files(directory, suffix):
     return file_list
 
 
+def manifest_version(path):
+    return int(path.split("/")[-1].removesuffix(".yaml"))
+
+
+def read_manifests(directory):
+    manifests = {}
+    for path in get_all_files(directory, "yaml"):
+        with open(path, "rb") as f:
+            manifests[os.path.relpath(path, directory)] = f.read()
+    return manifests
+
+
+def load_compile_cache(path=COMPILE_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable compile cache {path}: {e}")
+        return {}
+
+
+def save_compile_cache(cache, path=COMPILE_CACHE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def manifest_contribution(raw):
+    app_version = yaml.safe_load(raw)
+    return {
+        "routes": app_version.get("routes", []),
+        "services": [[s["app"], s["svc"], s["svc_ver"]] for s in app_version["services"]],
+    }
+
+
+def compile_manifests(manifests, cache):
+    """
+    Merge the routes and service lookup of every app version manifest,
+    only parsing manifests whose content hash is not already cached
+    
+    Parameters:
+    manifests (dict): "<app>/<app_ver>.yaml" -> raw manifest content
+    cache (dict): content hash -> contribution, updated in place and pruned
+    
+    Returns:
+    tuple: (routes, lookup, changed_apps), changed_apps holds the apps with
+    a manifest that was added, edited or removed since the cache was filled
+    """
+    routes = []
+    lookup = {}
+    changed_apps = set()
+    hashes = set()
+    
+    sort_key = lambda p: (p.split("/")[-2], manifest_version(p))
+    for path in sorted(manifests, key=sort_key):
+        app, app_ver = path.split("/")[-2], manifest_version(path)
+        key = cortex.manifest_util.blob_sha(manifests[path])
+        hashes.add(key)
+        if key not in cache:
+            cache[key] = manifest_contribution(manifests[path])
+            changed_apps.add(app)
+        # remembered so a removed manifest can still be put down to its app
+        cache[key].setdefault("app", app)
+        
+        contribution = cache[key]
+        routes += contribution["routes"]
+        for svc_app, svc, svc_ver in contribution["services"]:
+            lookup[(svc_app, svc, app_ver)] = svc_ver
+    
+    for key in [k for k in cache if k not in hashes]:
+        removed = cache.pop(key)
+        if "app" in removed:
+            changed_apps.add(removed["app"])
+    
+    print(f"Compiled {len(manifests)} manifests, changed apps: {sorted(changed_apps)}")
+    return routes, lookup, changed_apps
+
+
 def transform_targets(targets, lookup):
     result = []
     for target in targets:
@@ -162,9 +153,22 @@ def transform_custom_routes(routes, lookup):
     return result
         
 
-def transform_routes(routes):
+def cluster_name(service_name):
+    return service_name.replace("/", "-").replace("@", "-").replace(".", "-")
+
+
+def referenced_services(routes, lookup):
+    """Full names of the deployed services that compiled routes point at"""
+    clusters = {r["cluster"] for r in routes if "cluster" in r}
+    names = {f"{app}/{svc}@{svc_ver}" for (app, svc, _), svc_ver in lookup.items()}
+    return [name for name in names if cluster_name(name) in clusters]
+
+
+def transform_routes(routes, services=None):
     
-    services_lookup = {s["name"].replace("/", "-").replace("@", "-").replace(".", "-"): s for s in cortex.dynamo_util.get_services()}
+    if services is None:
+        services = cortex.dynamo_util.get_services()
+    services_lookup = {cluster_name(s["name"]): s for s in services}
     
     result = []
     for route in routes:
@@ -189,34 +193,184 @@ def transform_routes(routes):
     return sort_routes(result)
 
 
-def update_envoy(url="http://hn-cortex.click/api/v1/routes"):
+def content_hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def route_id(route):
+    return json.dumps([route["prefix"], route.get("headers", [])], sort_keys=True, separators=(",", ":"))
+
+
+def route_clusters(routes):
+    clusters = {}
+    for r in routes:
+        if "cluster" in r:
+            clusters[r["cluster"]] = {k: r[k] for k in CLUSTER_FIELDS if k in r}
+        for wc in r.get("weighted_clusters", []):
+            clusters.setdefault(wc["name"], {"cluster": wc["name"]})
+    return clusters
+
+
+def build_snapshot(routes):
+    """
+    Fingerprinted summary of a compiled route table: per route and per
+    cluster content hashes plus the route order Envoy matches in
+    """
+    return {
+        "fingerprint": content_hash(routes),
+        "order": [route_id(r) for r in routes],
+        "routes": {route_id(r): content_hash(r) for r in routes},
+        "clusters": {name: content_hash(c) for name, c in route_clusters(routes).items()},
+    }
+
+
+def diff_snapshots(previous, snapshot, routes):
+    def diff(old, new, values):
+        return {
+            "added": [values[k] for k in new if k not in old],
+            "removed": [k for k in old if k not in new],
+            "changed": [values[k] for k in new if k in old and old[k] != new[k]],
+        }
     
-    import subprocess
-    if os.path.exists("temp"):
-        subprocess.run(["rm", "-rf", "temp"], check=True)
-        
-    download_manifests("temp")
-    avm_paths = get_all_files("temp", "yaml")
-    routes = []
-    lookup = {}
-    sort_key = lambda x: x.split("/")[-1].removesuffix(".yaml")
-    for avm_path in sorted(avm_paths, key=sort_key):
-        app_version = yaml.safe_load(open(avm_path, "r").read())
-        print(avm_path)
-        routes += app_version.get("routes", [])
-        
-        app_ver = int(avm_path.split("/")[-1].removesuffix(".yaml"))
-        for service in app_version["services"]:
-            print((service["app"], service["svc"], app_ver))
-            lookup[(service["app"], service["svc"], app_ver)] = service["svc_ver"]
+    return {
+        "base": previous["fingerprint"],
+        "fingerprint": snapshot["fingerprint"],
+        "order": snapshot["order"],
+        "routes": diff(previous["routes"], snapshot["routes"], {route_id(r): r for r in routes}),
+        "clusters": diff(previous["clusters"], snapshot["clusters"], route_clusters(routes)),
+    }
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable route snapshot {path}: {e}")
+        return None
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def default_resources_url(url):
+    if ENVOY_RESOURCES_URL:
+        return ENVOY_RESOURCES_URL
+    if url.rstrip("/").endswith("/routes"):
+        return url.rstrip("/")[:-len("/routes")] + "/resources"
+    return None
+
+
+def control_plane_version(resources_url):
+    """
+    Snapshot version the control plane is serving, None if it can't be asked
+    """
+    try:
+        response = requests.get(resources_url, timeout=10)
+        response.raise_for_status()
+        return response.json().get("version")
+    except (requests.RequestException, ValueError) as e:
+        print(f"Could not read control plane version from {resources_url}: {e}")
+        return None
+
+
+def push_routes(routes, url, delta_url=None, snapshot_path=SNAPSHOT_PATH, force=False, resources_url=None):
+    """
+    Push the compiled route table to the control plane, skipping the push
+    when it matches the last successfully pushed snapshot. When delta_url is
+    set only the added, removed and changed routes and clusters are sent,
+    falling back to the full table if the delta is rejected.
+    
+    The control plane only keeps its snapshot in memory, so with
+    resources_url set the local snapshot is only trusted while the control
+    plane still serves the version recorded after our last push. A restart
+    or a push from elsewhere changes it and the full table is sent again.
+    """
+    snapshot = build_snapshot(routes)
+    previous = load_snapshot(snapshot_path)
+    if previous and resources_url and not force:
+        served = control_plane_version(resources_url)
+        if served is None or served != previous.get("control_plane_version"):
+            print(f"Control plane serves version {served}, not the last pushed one, pushing full route table")
+            previous = None
+    
+    if previous and previous["fingerprint"] == snapshot["fingerprint"] and not force:
+        print(f"Route table unchanged ({snapshot['fingerprint'][:12]}), skipping push")
+        return None
     
-    xroutes = cortex.dynamo_util.get_all_rows("routes")
-    routes = transform_routes(routes) + transform_custom_routes(xroutes, lookup)
+    response = None
+    if delta_url and previous and not force:
+        response = requests.post(delta_url, json=diff_snapshots(previous, snapshot, routes))
+        if not response.ok:
+            print(f"Delta push rejected with {response.status_code}, pushing full route table")
+    if response is None or not response.ok:
+        response = requests.post(url, json={"routes": routes})
+    
+    if response.ok:
+        if resources_url:
+            snapshot["control_plane_version"] = control_plane_version(resources_url)
+        save_snapshot(snapshot, snapshot_path)
+    print("!!", response.text)
+    return response
+
+
+def timed(timings, stage, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 3)
+
+
+def update_envoy(url="http://hn-cortex.click/api/v1/routes", source=MANIFEST_SOURCE, force=False):
+    """
+    Fetch manifests and custom routes concurrently, look up the services
+    the routes reference, compile the route table and push it to the
+    control plane, even if it looks unchanged when force is set
+    
+    Returns:
+    dict: changed apps, whether the table was pushed and per-stage timings
+    """
+    timings = {}
+    start = time.perf_counter()
+    
+    # manifests and custom routes are independent, so wait on the slower instead of their sum
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        manifests = executor.submit(timed, timings, "manifests", cortex.manifest_util.get_manifests, source)
+        xroutes = executor.submit(timed, timings, "custom_routes", cortex.dynamo_util.get_all_rows, "routes")
+        manifests, xroutes = manifests.result(), xroutes.result()
+    timings["fetch"] = round(time.perf_counter() - start, 3)
+    
+    compile_start = time.perf_counter()
+    cache = load_compile_cache()
+    routes, lookup, changed_apps = compile_manifests(manifests, cache)
+    save_compile_cache(cache)
+    
+    services = timed(timings, "services", cortex.dynamo_util.get_services_by_name, referenced_services(routes, lookup))
+    routes = transform_routes(routes, list(services.values())) + transform_custom_routes(xroutes, lookup)
     routes = sort_routes(routes)
+    timings["compile"] = round(time.perf_counter() - compile_start, 3)
     
-    # import json; open("test-1.yaml", "w").write(yaml.dump(sort_routes(routes)))
+    response = timed(
+        timings, "push", push_routes,
+        routes, url, ENVOY_DELTA_URL, SNAPSHOT_PATH, force, default_resources_url(url),
+    )
+    timings["total"] = round(time.perf_counter() - start, 3)
+    print("update_envoy timings:", ", ".join(f"{k}={v}s" for k, v in timings.items()))
+    if response is not None and not response.ok:
+        # fails the deploy, or the job it waits on, instead of reporting success
+        raise RuntimeError(f"Route push rejected with {response.status_code}: {response.text}")
     
-    payload = {"routes": routes}
-    response = requests.post(url, json=payload)
-    print("!!",response.text)
-    
\ No newline at end of file
+    return {
+        "changed_apps": sorted(changed_apps),
+        "routes": len(routes),
+        "pushed": response is not None and response.ok,
+        "timings": timings,
+    }
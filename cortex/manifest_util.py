@@ -0,0 +1,218 @@
+import os
+import json
+import hashlib
+import tarfile
+import requests
+from concurrent.futures import ThreadPoolExecutor
+import cortex.dynamo_util
+
+DEPLOY_LOG_OWNER = "hugh-nguyen"
+DEPLOY_LOG_REPO = "cortex-deploy-log"
+MANIFEST_FOLDER = "app-version-manifests"
+CERT_PATH = os.environ.get("CERT_PATH", None)
+MIRROR_DIR = os.path.join(os.environ.get("CORTEX_CACHE_DIR", ".cortex-cache"), "manifest-mirror")
+# above this many missing blobs one tarball is cheaper than a request per blob
+ARCHIVE_THRESHOLD = 20
+
+
+def github_headers():
+    headers = {"Accept": "application/vnd.github+json"}
+    token = os.getenv("GH_PERSONAL_TOKEN")
+    if token:
+        headers["Authorization"] = f"token {token}"
+    return headers
+
+
+def request_get(url, headers={}, **kwargs):
+    if CERT_PATH:
+        kwargs["verify"] = CERT_PATH
+    return requests.get(url, headers={**github_headers(), **headers}, timeout=30, **kwargs)
+
+
+def iter_archive_manifests(fileobj, folder=MANIFEST_FOLDER):
+    """
+    Stream app version manifests out of a gzipped repository tarball
+
+    Yields:
+    tuple: ("<app>/<app_ver>.yaml", raw manifest content)
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            # GitHub wraps everything in a "<owner>-<repo>-<sha>/" directory
+            path = member.name.split("/", 1)[-1]
+            if not path.startswith(f"{folder}/") or not path.endswith(".yaml"):
+                continue
+            yield path[len(folder) + 1:], archive.extractfile(member).read()
+
+
+def fetch_manifest_archive(ref="", folder=MANIFEST_FOLDER):
+    """
+    Download the deploy log as a single tarball and unpack its manifests in memory
+
+    Returns:
+    dict: "<app>/<app_ver>.yaml" -> raw manifest content
+    """
+    url = f"https://api.github.com/repos/{DEPLOY_LOG_OWNER}/{DEPLOY_LOG_REPO}/tarball"
+    if ref:
+        url = f"{url}/{ref}"
+    print(url)
+
+    with request_get(url, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        manifests = dict(iter_archive_manifests(response.raw, folder))
+
+    print(f"Fetched {len(manifests)} manifests from {DEPLOY_LOG_REPO}")
+    return manifests
+
+
+def blob_sha(raw):
+    # same id git gives the blob, so mirror and cache keys match the deploy log tree
+    if isinstance(raw, str):
+        raw = raw.encode()
+    return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+
+def load_mirror_index(mirror_dir=MIRROR_DIR):
+    path = os.path.join(mirror_dir, "index.json")
+    if not os.path.exists(path):
+        return {"etag": None, "paths": {}}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest mirror index {path}: {e}")
+        return {"etag": None, "paths": {}}
+
+
+def save_mirror_index(index, mirror_dir=MIRROR_DIR):
+    os.makedirs(mirror_dir, exist_ok=True)
+    path = os.path.join(mirror_dir, "index.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def blob_path(sha, mirror_dir=MIRROR_DIR):
+    return os.path.join(mirror_dir, "blobs", sha)
+
+
+def write_blob(raw, mirror_dir=MIRROR_DIR):
+    sha = blob_sha(raw)
+    path = blob_path(sha, mirror_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(raw)
+    os.replace(f"{path}.tmp", path)
+    return sha
+
+
+def fetch_manifest_tree(etag=None, ref="HEAD", folder=MANIFEST_FOLDER):
+    """
+    Conditionally list the blob SHA of every manifest in the deploy log
+
+    Returns:
+    tuple: (paths, etag), paths is None when the tree is unchanged since etag
+    """
+    url = f"https://api.github.com/repos/{DEPLOY_LOG_OWNER}/{DEPLOY_LOG_REPO}/git/trees/{ref}?recursive=1"
+    headers = {"If-None-Match": etag} if etag else {}
+    response = request_get(url, headers=headers)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+
+    data = response.json()
+    if data.get("truncated"):
+        raise ValueError(f"Tree listing for {DEPLOY_LOG_REPO} was truncated")
+
+    paths = {}
+    for entry in data["tree"]:
+        path = entry["path"]
+        if entry["type"] == "blob" and path.startswith(f"{folder}/") and path.endswith(".yaml"):
+            paths[path[len(folder) + 1:]] = entry["sha"]
+    return paths, response.headers.get("ETag")
+
+
+def fetch_blob(sha):
+    url = f"https://api.github.com/repos/{DEPLOY_LOG_OWNER}/{DEPLOY_LOG_REPO}/git/blobs/{sha}"
+    response = request_get(url, headers={"Accept": "application/vnd.github.raw"})
+    response.raise_for_status()
+    # the mirror is keyed by sha, so a truncated or wrong body must not land there
+    if blob_sha(response.content) != sha:
+        raise ValueError(f"Blob {sha} from {DEPLOY_LOG_REPO} does not match its sha")
+    return response.content
+
+
+def mirror_manifests(mirror_dir=MIRROR_DIR):
+    """
+    Return the deploy log manifests from a local content-addressed mirror,
+    revalidating it with one conditional tree request and only downloading
+    blobs the mirror does not already hold
+
+    Returns:
+    dict: "<app>/<app_ver>.yaml" -> raw manifest content
+    """
+    index = load_mirror_index(mirror_dir)
+    try:
+        paths, etag = fetch_manifest_tree(index["etag"])
+    except ValueError as e:
+        print(f"{e}, falling back to the archive")
+        return fetch_manifest_archive()
+    if paths is None:
+        paths = index["paths"]
+
+    missing = {sha for sha in paths.values() if not os.path.exists(blob_path(sha, mirror_dir))}
+    if len(missing) > ARCHIVE_THRESHOLD:
+        for raw in fetch_manifest_archive().values():
+            missing.discard(write_blob(raw, mirror_dir))
+    for sha in missing:
+        write_blob(fetch_blob(sha), mirror_dir)
+
+    if paths != index["paths"]:
+        referenced = set(paths.values())
+        blobs_dir = os.path.join(mirror_dir, "blobs")
+        for sha in os.listdir(blobs_dir) if os.path.isdir(blobs_dir) else []:
+            if sha not in referenced:
+                os.remove(os.path.join(blobs_dir, sha))
+    save_mirror_index({"etag": etag, "paths": paths}, mirror_dir)
+
+    manifests = {}
+    for path, sha in paths.items():
+        with open(blob_path(sha, mirror_dir), "rb") as f:
+            manifests[path] = f.read()
+    print(f"Mirrored {len(manifests)} manifests, downloaded {len(missing)} blobs")
+    return manifests
+
+
+def dynamo_manifests(max_workers=8):
+    """
+    Read every app version manifest from the AppVersions table, querying
+    apps in parallel, so route compilation does not depend on GitHub
+
+    Returns:
+    dict: "<app>/<app_ver>.yaml" -> raw manifest content
+    """
+    def fetch(app_name):
+        versions = cortex.dynamo_util.get_app_version_manifests(app_name)
+        return {f"{app_name}/{version}.yaml": raw for version, raw in versions}
+
+    manifests = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for app_manifests in executor.map(fetch, cortex.dynamo_util.get_app_names()):
+            manifests.update(app_manifests)
+
+    print(f"Read {len(manifests)} manifests from AppVersions")
+    return manifests
+
+
+MANIFEST_SOURCES = {
+    "github": mirror_manifests,
+    "archive": fetch_manifest_archive,
+    "dynamo": dynamo_manifests,
+}
+
+
+def get_manifests(source="github"):
+    return MANIFEST_SOURCES[source]()
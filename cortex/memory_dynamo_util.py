@@ -0,0 +1,714 @@
+import re
+import copy
+import json
+import base64
+import runpy
+import threading
+import zlib
+from decimal import Decimal
+from botocore.awsrequest import AWSResponse
+from boto3.dynamodb.types import TypeDeserializer
+
+# The tables dynamo_util works with, as CreateTable parameters (see manual/dynamo,
+# manual/gsi.json and manual/apps_gsi.json)
+TABLE_DEFINITIONS = [
+    {
+        'TableName': 'Apps',
+        'KeySchema': [{'AttributeName': 'name', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [
+            {'AttributeName': 'name', 'AttributeType': 'S'},
+            {'AttributeName': 'team_id', 'AttributeType': 'N'},
+        ],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': 'TeamIdIndex',
+            'KeySchema': [{'AttributeName': 'team_id', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+    },
+    {
+        'TableName': 'AppVersions',
+        'KeySchema': [
+            {'AttributeName': 'app_name', 'KeyType': 'HASH'},
+            {'AttributeName': 'version', 'KeyType': 'RANGE'},
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'app_name', 'AttributeType': 'S'},
+            {'AttributeName': 'version', 'AttributeType': 'N'},
+        ],
+    },
+    {
+        'TableName': 'Teams',
+        'KeySchema': [{'AttributeName': 'team_id', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'team_id', 'AttributeType': 'N'}],
+    },
+    {
+        'TableName': 'Routes',
+        'KeySchema': [
+            {'AttributeName': 'prefix', 'KeyType': 'HASH'},
+            {'AttributeName': 'team_id', 'KeyType': 'RANGE'},
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'prefix', 'AttributeType': 'S'},
+            {'AttributeName': 'team_id', 'AttributeType': 'N'},
+        ],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': 'TeamIdIndex',
+            'KeySchema': [{'AttributeName': 'team_id', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+    },
+    {
+        'TableName': 'Services',
+        'KeySchema': [{'AttributeName': 'name', 'KeyType': 'HASH'}],
+        'AttributeDefinitions': [{'AttributeName': 'name', 'AttributeType': 'S'}],
+    },
+    {
+        'TableName': 'TeamDashboard',
+        'KeySchema': [
+            {'AttributeName': 'team_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'},
+        ],
+        'AttributeDefinitions': [
+            {'AttributeName': 'team_id', 'AttributeType': 'N'},
+            {'AttributeName': 'sk', 'AttributeType': 'S'},
+        ],
+    },
+]
+
+# DynamoDB stops a Query or Scan page at 1 MB of items
+PAGE_BYTES = 1024 * 1024
+MISSING = object()
+_deserializer = TypeDeserializer()
+
+
+class DynamoError(Exception):
+    def __init__(self, code, message, **fields):
+        super().__init__(message)
+        self.code = code
+        self.fields = fields
+
+
+def plain(value):
+    """Comparable Python value of a wire format AttributeValue"""
+    if value is MISSING:
+        return value
+    (kind, raw), = value.items()
+    if kind == 'N':
+        return Decimal(raw)
+    if kind in ('S', 'B'):
+        return raw
+    return _deserializer.deserialize(value)
+
+
+def decode_binary(value):
+    # the JSON request body carries B and BS base64 encoded, responses hand back bytes
+    if isinstance(value, dict):
+        if set(value) == {'B'} and isinstance(value['B'], str):
+            return {'B': base64.b64decode(value['B'])}
+        if set(value) == {'BS'}:
+            return {'BS': [base64.b64decode(v) for v in value['BS']]}
+        return {k: decode_binary(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_binary(v) for v in value]
+    return value
+
+
+def item_size(item):
+    return len(json.dumps(item, default=lambda b: 'x' * len(b)))
+
+
+class Expression:
+    """
+    Parser and evaluator for the subset of DynamoDB expression syntax
+    boto3 generates: comparisons, BETWEEN, IN, AND/OR/NOT, attribute_exists,
+    attribute_not_exists, begins_with, contains and size
+    """
+
+    TOKEN = re.compile(r"\s*(<>|<=|>=|[=<>(),]|[#:]?[A-Za-z0-9_.\-\[\]]+)")
+    FUNCTIONS = ('attribute_exists', 'attribute_not_exists', 'begins_with', 'contains', 'size')
+
+    def __init__(self, text, names=None, values=None):
+        self.tokens = self.tokenize(text)
+        self.names = names or {}
+        self.values = values or {}
+        self.pos = 0
+        self.tree = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise DynamoError('ValidationException', f"Invalid expression: {text}")
+
+    @classmethod
+    def tokenize(cls, text):
+        tokens, pos = [], 0
+        text = text.strip()
+        while pos < len(text):
+            match = cls.TOKEN.match(text, pos)
+            if not match:
+                raise DynamoError('ValidationException', f"Invalid expression: {text}")
+            tokens.append(match.group(1))
+            pos = match.end()
+        return tokens
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected and token.upper() != expected):
+            raise DynamoError('ValidationException', f"Expected {expected} in expression, got {token}")
+        self.pos += 1
+        return token
+
+    def parse_or(self):
+        node = self.parse_and()
+        while (self.peek() or '').upper() == 'OR':
+            self.take()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while (self.peek() or '').upper() == 'AND':
+            self.take()
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if (self.peek() or '').upper() == 'NOT':
+            self.take()
+            return ('not', self.parse_not())
+        return self.parse_primary()
+
+    def parse_primary(self):
+        if self.peek() == '(':
+            self.take()
+            node = self.parse_or()
+            self.take(')')
+            return node
+
+        left = self.parse_operand()
+        if left[0] == 'call' and left[1] != 'size':
+            return left
+        op = self.take()
+        if op.upper() == 'BETWEEN':
+            low = self.parse_operand()
+            self.take('AND')
+            return ('between', left, low, self.parse_operand())
+        if op.upper() == 'IN':
+            self.take('(')
+            options = [self.parse_operand()]
+            while self.peek() == ',':
+                self.take()
+                options.append(self.parse_operand())
+            self.take(')')
+            return ('in', left, options)
+        if op not in ('=', '<>', '<', '<=', '>', '>='):
+            raise DynamoError('ValidationException', f"Unsupported operator {op}")
+        return ('compare', op, left, self.parse_operand())
+
+    def parse_operand(self):
+        token = self.take()
+        if token in self.FUNCTIONS and self.peek() == '(':
+            self.take('(')
+            args = [self.parse_operand()]
+            while self.peek() == ',':
+                self.take()
+                args.append(self.parse_operand())
+            self.take(')')
+            return ('call', token, args)
+        if token.startswith(':'):
+            if token not in self.values:
+                raise DynamoError('ValidationException', f"Value {token} is not defined")
+            return ('value', self.values[token])
+        return ('path', [self.names.get(part, part) for part in token.split('.')])
+
+    def resolve(self, operand, item):
+        kind = operand[0]
+        if kind == 'value':
+            return operand[1]
+        if kind == 'call':
+            value = self.resolve(operand[2][0], item)
+            if value is MISSING:
+                return MISSING
+            return {'N': str(len(plain(value)))}
+        value = {'M': item}
+        for part in operand[1]:
+            if 'M' not in value or part not in value['M']:
+                return MISSING
+            value = value['M'][part]
+        return value
+
+    def evaluate(self, item, node=None):
+        node = node or self.tree
+        kind = node[0]
+        if kind == 'or':
+            return self.evaluate(item, node[1]) or self.evaluate(item, node[2])
+        if kind == 'and':
+            return self.evaluate(item, node[1]) and self.evaluate(item, node[2])
+        if kind == 'not':
+            return not self.evaluate(item, node[1])
+        if kind == 'call':
+            values = [plain(self.resolve(a, item)) for a in node[2]]
+            if node[1] == 'attribute_exists':
+                return values[0] is not MISSING
+            if node[1] == 'attribute_not_exists':
+                return values[0] is MISSING
+            if MISSING in values:
+                return False
+            if node[1] == 'begins_with':
+                return values[0].startswith(values[1])
+            return values[1] in values[0]
+        if kind == 'between':
+            value, low, high = (plain(self.resolve(a, item)) for a in node[1:])
+            return MISSING not in (value, low, high) and low <= value <= high
+        if kind == 'in':
+            value = plain(self.resolve(node[1], item))
+            return value is not MISSING and value in [plain(self.resolve(o, item)) for o in node[2]]
+
+        op, left, right = node[1], plain(self.resolve(node[2], item)), plain(self.resolve(node[3], item))
+        if left is MISSING or right is MISSING:
+            return op == '<>' and left is not right
+        try:
+            return {
+                '=': left == right, '<>': left != right,
+                '<': left < right, '<=': left <= right,
+                '>': left > right, '>=': left >= right,
+            }[op]
+        except TypeError:
+            return False
+
+    def equality(self, attribute):
+        """Value the expression pins attribute to with a top-level `attribute = :v`"""
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            if node[0] == 'and':
+                stack += [node[1], node[2]]
+            elif node[0] == 'compare' and node[1] == '=' and node[2][0] == 'path' and node[2][1] == [attribute]:
+                return node[3][1] if node[3][0] == 'value' else None
+        return None
+
+
+def projection(item, expression, names):
+    if not expression:
+        return item
+    attributes = {names.get(p.strip().split('.')[0], p.strip().split('.')[0]) for p in expression.split(',')}
+    return {k: v for k, v in item.items() if k in attributes}
+
+
+def apply_update(item, expression, names, values):
+    """Apply the SET, REMOVE and ADD clauses of an UpdateExpression to a copy of item"""
+    item = dict(item)
+    clauses = re.split(r"\b(SET|REMOVE|ADD|DELETE)\b", expression, flags=re.I)
+    for keyword, body in zip(clauses[1::2], clauses[2::2]):
+        keyword = keyword.upper()
+        for action in split_top_level(body):
+            if keyword == 'REMOVE':
+                item.pop(names.get(action, action), None)
+                continue
+            if keyword == 'SET':
+                path, operand = (s.strip() for s in action.split('=', 1))
+                item[names.get(path, path)] = set_operand(item, operand, names, values)
+                continue
+            path, value = action.split()
+            path, value = names.get(path, path), values[value]
+            current = item.get(path)
+            if keyword == 'ADD' and 'N' in value:
+                total = plain(current) + plain(value) if current else plain(value)
+                item[path] = {'N': str(total)}
+            else:
+                kind, = value
+                members = set(current[kind]) if current else set()
+                members = members | set(value[kind]) if keyword == 'ADD' else members - set(value[kind])
+                if members:
+                    item[path] = {kind: sorted(members)}
+                else:
+                    item.pop(path, None)
+    return item
+
+
+def split_top_level(body):
+    parts, depth, current = [], 0, ''
+    for char in body:
+        depth += char == '('
+        depth -= char == ')'
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def set_operand(item, operand, names, values):
+    for op in ('+', '-'):
+        left, sep, right = operand.partition(f" {op} ")
+        if sep:
+            total = plain(set_operand(item, left, names, values))
+            change = plain(set_operand(item, right, names, values))
+            return {'N': str(total + change if op == '+' else total - change)}
+
+    match = re.fullmatch(r"(if_not_exists|list_append)\s*\((.*)\)", operand.strip())
+    if match:
+        first, second = (set_operand(item, a, names, values) for a in split_top_level(match.group(2)))
+        if match.group(1) == 'if_not_exists':
+            return second if first is MISSING else first
+        return {'L': first['L'] + second['L']}
+    operand = operand.strip()
+    if operand.startswith(':'):
+        return values[operand]
+    return item.get(names.get(operand, operand), MISSING)
+
+
+class MemoryTable:
+    def __init__(self, definition):
+        self.definition = definition
+        self.name = definition['TableName']
+        self.key = [k['AttributeName'] for k in definition['KeySchema']]
+        self.indexes = {
+            index['IndexName']: [k['AttributeName'] for k in index['KeySchema']]
+            for index in definition.get('GlobalSecondaryIndexes', []) + definition.get('LocalSecondaryIndexes', [])
+        }
+        self.items = {}
+
+    def key_of(self, item):
+        try:
+            return tuple(plain(item[k]) for k in self.key)
+        except KeyError:
+            raise DynamoError('ValidationException', f"Missing the key {self.key} of {self.name}")
+
+    def key_item(self, item, key_attributes=None):
+        return {k: item[k] for k in (key_attributes or self.key) if k in item}
+
+    def sorted_items(self, index=None, partition=None):
+        key = self.indexes[index] if index else self.key
+        items = [
+            item for item in self.items.values()
+            if all(k in item for k in key) and (partition is None or item[key[0]] == partition)
+        ]
+        # partitions in a stable order, then by sort key
+        return sorted(items, key=lambda i: (str(plain(i[key[0]])), *(plain(i[k]) for k in key[1:])))
+
+    def describe(self):
+        return {
+            **{k: v for k, v in self.definition.items() if k not in ('ProvisionedThroughput', 'BillingMode')},
+            'TableStatus': 'ACTIVE',
+            'ItemCount': len(self.items),
+            'TableSizeBytes': sum(item_size(i) for i in self.items.values()),
+        }
+
+
+class MemoryDynamo:
+    """
+    In-process stand-in for DynamoDB. Installed on a boto3 session it answers
+    every DynamoDB call made through that session's resources and clients,
+    so dynamo_util and its callers run unchanged, offline and deterministically.
+
+    It keeps items in their wire format and implements the calls dynamo_util
+    makes: table management, get/put/update/delete with conditions, paginated
+    Query (including GSIs) and segmented Scan, batch get/write and
+    TransactWriteItems.
+    """
+
+    def __init__(self, tables=TABLE_DEFINITIONS):
+        self.lock = threading.RLock()
+        self.tables = {}
+        self.calls = {}
+        for definition in tables:
+            self.create_table(definition)
+
+    def install(self, session):
+        """Route DynamoDB calls of a boto3 (or botocore) session here"""
+        events = getattr(session, 'events', None) or session.get_component('event_emitter')
+        events.register('before-call.dynamodb', self.handle, unique_id=f"memory-dynamo-{id(self)}")
+        return session
+
+    def handle(self, model, params, **kwargs):
+        operation = model.name
+        body = decode_binary(json.loads(params['body'] or b'{}'))
+        method = getattr(self, re.sub(r"(?<!^)(?=[A-Z])", "_", operation).lower(), None)
+        try:
+            if method is None:
+                raise DynamoError('ValidationException', f"{operation} is not supported in memory")
+            with self.lock:
+                self.calls[operation] = self.calls.get(operation, 0) + 1
+                # boto3 deserializes responses in place, never hand out the stored items
+                response, status = copy.deepcopy(method(body)), 200
+        except DynamoError as e:
+            response, status = {'Error': {'Code': e.code, 'Message': str(e)}, **e.fields}, 400
+        response['ResponseMetadata'] = {'HTTPStatusCode': status, 'RetryAttempts': 0}
+        return AWSResponse(None, status, {}, None), response
+
+    def table(self, name):
+        if name not in self.tables:
+            raise DynamoError('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found")
+        return self.tables[name]
+
+    # table management
+
+    def create_table(self, params):
+        if params['TableName'] in self.tables:
+            raise DynamoError('ResourceInUseException', f"Table already exists: {params['TableName']}")
+        table = MemoryTable(params)
+        self.tables[table.name] = table
+        return {'TableDescription': table.describe()}
+
+    def delete_table(self, params):
+        table = self.table(params['TableName'])
+        del self.tables[table.name]
+        return {'TableDescription': table.describe()}
+
+    def describe_table(self, params):
+        return {'Table': self.table(params['TableName']).describe()}
+
+    def list_tables(self, params):
+        return {'TableNames': sorted(self.tables)}
+
+    def update_table(self, params):
+        table = self.table(params['TableName'])
+        for update in params.get('GlobalSecondaryIndexUpdates', []):
+            if 'Create' in update:
+                index = update['Create']
+                table.indexes[index['IndexName']] = [k['AttributeName'] for k in index['KeySchema']]
+            if 'Delete' in update:
+                table.indexes.pop(update['Delete']['IndexName'], None)
+        return {'TableDescription': table.describe()}
+
+    # single items
+
+    def check(self, params, current):
+        if not params.get('ConditionExpression'):
+            return
+        condition = Expression(
+            params['ConditionExpression'],
+            params.get('ExpressionAttributeNames'),
+            params.get('ExpressionAttributeValues'),
+        )
+        if not condition.evaluate(current or {}):
+            raise DynamoError('ConditionalCheckFailedException', "The conditional request failed")
+
+    def put_item(self, params):
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Item'])
+        old = table.items.get(key)
+        self.check(params, old)
+        table.items[key] = params['Item']
+        return {'Attributes': old} if old and params.get('ReturnValues') == 'ALL_OLD' else {}
+
+    def get_item(self, params):
+        table = self.table(params['TableName'])
+        item = table.items.get(table.key_of(params['Key']))
+        if item is None:
+            return {}
+        return {'Item': projection(item, params.get('ProjectionExpression'), params.get('ExpressionAttributeNames', {}))}
+
+    def delete_item(self, params):
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Key'])
+        old = table.items.get(key)
+        self.check(params, old)
+        table.items.pop(key, None)
+        return {'Attributes': old} if old and params.get('ReturnValues') == 'ALL_OLD' else {}
+
+    def update_item(self, params):
+        table = self.table(params['TableName'])
+        key = table.key_of(params['Key'])
+        old = table.items.get(key)
+        self.check(params, old)
+        item = apply_update(
+            old or params['Key'],
+            params.get('UpdateExpression', ''),
+            params.get('ExpressionAttributeNames', {}),
+            params.get('ExpressionAttributeValues', {}),
+        )
+        table.items[key] = item
+        return_values = params.get('ReturnValues', 'NONE')
+        if return_values == 'ALL_NEW':
+            return {'Attributes': item}
+        if return_values == 'ALL_OLD' and old:
+            return {'Attributes': old}
+        return {}
+
+    # reads over many items
+
+    def page(self, table, items, params, key_attributes):
+        """Cut one page out of items the way Query and Scan paginate"""
+        start = params.get('ExclusiveStartKey')
+        if start:
+            start_key = tuple(plain(start.get(k, MISSING)) for k in key_attributes)
+            keys = [tuple(plain(i.get(k, MISSING)) for k in key_attributes) for i in items]
+            items = items[keys.index(start_key) + 1:] if start_key in keys else []
+
+        names = params.get('ExpressionAttributeNames', {})
+        filter_expression = None
+        if params.get('FilterExpression'):
+            filter_expression = Expression(params['FilterExpression'], names, params.get('ExpressionAttributeValues'))
+
+        limit = params.get('Limit')
+        page, evaluated, size = [], 0, 0
+        for item in items:
+            if (limit and evaluated >= limit) or size >= PAGE_BYTES:
+                break
+            evaluated += 1
+            size += item_size(item)
+            if filter_expression is None or filter_expression.evaluate(item):
+                page.append(projection(item, params.get('ProjectionExpression'), names))
+
+        response = {'Count': len(page), 'ScannedCount': evaluated}
+        if params.get('Select') != 'COUNT':
+            response['Items'] = page
+        if evaluated < len(items):
+            last = items[evaluated - 1]
+            response['LastEvaluatedKey'] = {k: last[k] for k in dict.fromkeys(key_attributes + table.key)}
+        return response
+
+    def query(self, params):
+        table = self.table(params['TableName'])
+        index = params.get('IndexName')
+        if index and index not in table.indexes:
+            raise DynamoError('ValidationException', f"The table does not have the specified index: {index}")
+        key = table.indexes[index] if index else table.key
+
+        condition = Expression(
+            params['KeyConditionExpression'],
+            params.get('ExpressionAttributeNames'),
+            params.get('ExpressionAttributeValues'),
+        )
+        partition = condition.equality(key[0])
+        if partition is None:
+            raise DynamoError('ValidationException', "Query condition missed key schema element")
+
+        items = [i for i in table.sorted_items(index, partition) if condition.evaluate(i)]
+        if not params.get('ScanIndexForward', True):
+            items.reverse()
+        return self.page(table, items, params, key)
+
+    def scan(self, params):
+        table = self.table(params['TableName'])
+        index = params.get('IndexName')
+        items = table.sorted_items(index)
+        total = params.get('TotalSegments')
+        if total:
+            # the same partition always lands in the same segment
+            items = [i for i in items if zlib.crc32(repr(table.key_of(i)[0]).encode()) % total == params['Segment']]
+        return self.page(table, items, params, table.indexes[index] if index else table.key)
+
+    # many items at once
+
+    def batch_get_item(self, params):
+        responses = {}
+        for name, request in params['RequestItems'].items():
+            table = self.table(name)
+            names = request.get('ExpressionAttributeNames', {})
+            responses[name] = [
+                projection(table.items[table.key_of(key)], request.get('ProjectionExpression'), names)
+                for key in request['Keys'] if table.key_of(key) in table.items
+            ]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, params):
+        for name, requests in params['RequestItems'].items():
+            for request in requests:
+                if 'PutRequest' in request:
+                    self.put_item({'TableName': name, 'Item': request['PutRequest']['Item']})
+                else:
+                    self.delete_item({'TableName': name, 'Key': request['DeleteRequest']['Key']})
+        return {'UnprocessedItems': {}}
+
+    def transact_write_items(self, params):
+        # run every action against a copy and only keep it if they all succeed
+        snapshot = {name: dict(table.items) for name, table in self.tables.items()}
+        reasons, failed = [], False
+        for action in params['TransactItems']:
+            (kind, request), = action.items()
+            try:
+                if kind == 'ConditionCheck':
+                    table = self.table(request['TableName'])
+                    self.check(request, table.items.get(table.key_of(request['Key'])))
+                else:
+                    getattr(self, {'Put': 'put_item', 'Update': 'update_item', 'Delete': 'delete_item'}[kind])(request)
+                reasons.append({'Code': 'None'})
+            except DynamoError as e:
+                if e.code == 'ValidationException':
+                    self.restore(snapshot)
+                    raise
+                reasons.append({'Code': e.code.replace('Exception', ''), 'Message': str(e)})
+                failed = True
+
+        if failed:
+            self.restore(snapshot)
+            codes = ', '.join(r['Code'] for r in reasons)
+            raise DynamoError(
+                'TransactionCanceledException',
+                f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                CancellationReasons=reasons,
+            )
+        return {}
+
+    def restore(self, snapshot):
+        for name, items in snapshot.items():
+            self.tables[name].items = items
+
+    # seeding
+
+    def seed_from_script(self, path):
+        """
+        Run one of the manual upload scripts (manual/dynamo_test_data.py,
+        manual/upload_data.py, ...) with boto3's default session routed here
+        """
+        import boto3
+        boto3.setup_default_session(region_name='ap-southeast-2')
+        self.install(boto3.DEFAULT_SESSION)
+        try:
+            runpy.run_path(path, run_name='__seed__')
+        finally:
+            boto3.DEFAULT_SESSION = None
+
+    def seed_fleet(self, teams=2, apps_per_team=5, versions_per_app=20, services_per_app=4):
+        """
+        Fill the tables with a generated fleet of apps, versions, services and
+        routes of a known size, the same for a given set of arguments
+        """
+        from boto3.dynamodb.types import TypeSerializer
+        serializer = TypeSerializer()
+
+        def put(table, item):
+            self.put_item({'TableName': table, 'Item': {k: serializer.serialize(v) for k, v in item.items()}})
+
+        for team_id in range(1, teams + 1):
+            put('Teams', {'team_id': team_id, 'team_name': f"team-{team_id}"})
+            for a in range(apps_per_team):
+                app = f"team{team_id}-app{a}"
+                svcs = [f"svc{s}" for s in range(services_per_app)]
+                put('Apps', {
+                    'name': app, 'team_id': team_id, 'versions': versions_per_app,
+                    'service_count': services_per_app, 'services': svcs, 'dependencies': [],
+                    'command_repo_url': f"https://github.com/hugh-nguyen/{app}-cortex-command",
+                })
+                for version in range(1, versions_per_app + 1):
+                    services = [{'app': app, 'svc': s, 'svc_ver': f"1.0.{version}"} for s in svcs]
+                    links = [
+                        {'source': {'app': app, 'svc': svcs[i]}, 'target': {'app': app, 'svc': svcs[i + 1]}}
+                        for i in range(len(svcs) - 1)
+                    ]
+                    routes = [
+                        {
+                            'prefix': f"/{app}/{s['svc']}/",
+                            'headers': {'X-App-Name': app, 'X-App-Version': version},
+                            'cluster': f"{app}-{s['svc']}-{s['svc_ver'].replace('.', '-')}",
+                        }
+                        for s in services
+                    ]
+                    manifest = json.dumps({'services': services, 'dependencies': [], 'links': links, 'routes': routes})
+                    put('AppVersions', {
+                        'app_name': app, 'version': version, 'run_id': team_id * 10 ** 6 + a * 10 ** 3 + version,
+                        'yaml': manifest, 'services': services, 'dependencies': [], 'links': links,
+                    })
+                    for s in services:
+                        put('Services', {
+                            'name': f"{app}/{s['svc']}@{s['svc_ver']}", 'app': app, 'svc': s['svc'],
+                            'ver': s['svc_ver'], 'platform': 'kubernetes', 'status': 'Good',
+                        })
+            put('Routes', {'prefix': f"/team{team_id}/", 'team_id': team_id, 'targets': []})
+        return self
@@ -0,0 +1,126 @@
+import sys
+from collections import defaultdict
+
+MISSING_APP_NAME = "zzzzzzzz"
+MISSING_APP_VERSION = 99999999
+
+
+def freeze(value):
+    """
+    Hashable, key order preserving copy of a route or service so duplicates
+    can be dropped without a YAML round-trip
+    """
+    if isinstance(value, dict):
+        return (dict, tuple((freeze(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(freeze(v) for v in value))
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def header_pairs(headers, name_keys):
+    """
+    Normalise both header shapes we pass around into (name, value) pairs:
+    manifest dicts ({"X-App-Version": 1}) and Envoy lists
+    ([{"Name": "X-App-Version", "Value": "1"}])
+    """
+    if not headers:
+        return ()
+    if isinstance(headers, dict):
+        return tuple((sys.intern(str(k)), sys.intern(str(v))) for k, v in headers.items())
+
+    pairs = []
+    for h in headers:
+        name = h.get(name_keys[0]) or h.get(name_keys[1])
+        if name:
+            value = h.get("Value") or h.get("value")
+            pairs.append((sys.intern(str(name)), sys.intern(str(value))))
+    return tuple(pairs)
+
+
+class Route:
+    __slots__ = ("data", "key", "prefix", "headers", "headers_to_add", "cluster", "custom")
+
+    def __init__(self, data):
+        self.data = data
+        self.key = freeze(data)
+        self.prefix = sys.intern(data["prefix"])
+        self.headers = header_pairs(data.get("headers"), ("Name", "name"))
+        self.headers_to_add = header_pairs(data.get("headers_to_add"), ("Key", "key"))
+        self.cluster = data.get("cluster") or ""
+        self.custom = data.get("custom") == True
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    @property
+    def signature(self):
+        return (self.prefix,) + tuple(value for _, value in self.headers)
+
+
+def _app_sort_keys(pairs):
+    lookup = dict(pairs)
+    return (
+        lookup.get("X-App-Name", MISSING_APP_NAME),
+        int(lookup.get("X-App-Version", MISSING_APP_VERSION)),
+    )
+
+
+def manifest_sort_key(route):
+    return (
+        route.prefix,
+        *_app_sort_keys(route.headers),
+        *_app_sort_keys(route.headers_to_add),
+        bool(route.headers_to_add),
+        route.data.get("is_override", False),
+        route.cluster,
+    )
+
+
+def envoy_sort_key(route):
+    # more header matchers sort earlier so Envoy tries the most specific route first
+    return (
+        route.prefix,
+        -len(dict(route.headers)),
+        *_app_sort_keys(route.headers),
+        *_app_sort_keys(route.headers_to_add),
+        bool(route.headers_to_add),
+        route.data.get("is_override", False),
+        route.cluster,
+    )
+
+
+def choose_route(group):
+    for r in group:
+        if r.custom:
+            return Route({k: v for k, v in r.data.items() if k != "custom"})
+    most_recent = group[0]
+    for r in group:
+        if r.cluster > most_recent.cluster:
+            most_recent = r
+    return most_recent
+
+
+def sort_routes(routes, sort_signature=True, sort_key=envoy_sort_key):
+    unique = list(dict.fromkeys(Route(r) for r in routes))
+
+    if sort_signature:
+        groups = defaultdict(list)
+        for r in unique:
+            groups[r.signature].append(r)
+        unique = [choose_route(group) for group in groups.values()]
+
+    return [r.data for r in sorted(unique, key=sort_key)]
+
+
+def services_sort_key(service):
+    return service["app"], service["svc"], service["svc_ver"]
+
+
+def sort_services(services):
+    unique = {freeze(s): s for s in services}
+    return sorted(unique.values(), key=services_sort_key)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cortex.dynamo_util import get_all_rows, get_table, iter_app_versions, dashboard_version_row
+
+# Fills TeamDashboard from the existing Apps and AppVersions items. Deploys
+# keep it up to date afterwards, re-running it just rewrites the same rows.
+
+count = 0
+with get_table('team_dashboard').batch_writer() as batch:
+    for app in get_all_rows('apps'):
+        if app.get('team_id') is None:
+            continue
+        for app_version in iter_app_versions(app['name'], 'graph'):
+            batch.put_item(Item=dashboard_version_row(app['team_id'], app_version))
+            count += 1
+
+print(f"Wrote {count} app versions to TeamDashboard")
@@ -0,0 +1,41 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from botocore.exceptions import ClientError
+from cortex.dynamo_util import get_all_rows, get_table, encode_manifest, COMPRESSED_MANIFEST
+
+# Moves the raw `yaml` of every AppVersions item written before manifests were
+# compressed into the compressed `yaml_z` attribute. Safe to re-run, items that
+# are already compressed have no `yaml` left and are skipped.
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--dry-run', action='store_true', default=False)
+args = parser.parse_args()
+
+table = get_table('app_versions')
+compressed, before, after = 0, 0, 0
+for item in get_all_rows('app_versions', ['app_name', 'version', 'yaml']):
+    if item.get('yaml') is None:
+        continue
+    value = encode_manifest(item)[COMPRESSED_MANIFEST]
+    before += len(item['yaml'].encode())
+    after += len(value)
+    compressed += 1
+    if args.dry_run:
+        continue
+    try:
+        table.update_item(
+            Key={'app_name': item['app_name'], 'version': item['version']},
+            UpdateExpression='SET #z = :z REMOVE #y',
+            ConditionExpression='#y = :y',
+            ExpressionAttributeNames={'#y': 'yaml', '#z': COMPRESSED_MANIFEST},
+            ExpressionAttributeValues={':y': item['yaml'], ':z': value},
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        print(f"Skipping {item['app_name']} {item['version']}, it changed during the backfill")
+
+print(f"{'Would compress' if args.dry_run else 'Compressed'} {compressed} manifests, {before} -> {after} bytes")
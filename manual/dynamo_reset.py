@@ -1,7 +1,12 @@
+import os
+import sys
 import boto3
 import json
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cortex.dynamo_util import get_all_rows
+
 subdomain = "e31e0db899-864799364"
 
 def delete_all_table_items(table_name, region_name='us-east-1'):
@@ -15,13 +20,11 @@ def delete_all_table_items(table_name, region_name='us-east-1'):
     if len(key_schema) > 1:
         range_key = next(item['AttributeName'] for item in key_schema if item['KeyType'] == 'RANGE')
     
-    items = []
-    scan_response = table.scan()
-    items.extend(scan_response.get('Items', []))
-    
-    while 'LastEvaluatedKey' in scan_response:
-        scan_response = table.scan(ExclusiveStartKey=scan_response['LastEvaluatedKey'])
-        items.extend(scan_response.get('Items', []))
+    items = get_all_rows(
+        table_name,
+        [hash_key, range_key] if range_key else [hash_key],
+        client=boto3.client('dynamodb', region_name=region_name),
+    )
     
     print(f"Found {len(items)} items in {table_name}")
     
@@ -56,6 +59,9 @@ if __name__ == "__main__":
     print("\nDeleting items from Services table...")
     delete_all_table_items('Services', region)
     
+    print("\nDeleting items from TeamDashboard table...")
+    delete_all_table_items('TeamDashboard', region)
+    
     print("\nDeletion complete!")
 
 dynamodb = boto3.resource('dynamodb')
@@ -0,0 +1,31 @@
+import asyncio
+import threading
+import time
+from async_util import fan_out
+
+
+def test_fan_out_1():
+    # at most limit calls run at once, failures and timeouts are reported per key
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def read(key):
+        with lock:
+            running.append(key)
+            peak.append(len(running))
+        try:
+            if key == "broken":
+                raise ValueError("no such app")
+            time.sleep(0.5 if key == "slow" else 0.02)
+            return key.upper()
+        finally:
+            with lock:
+                running.remove(key)
+
+    keys = ["app1", "app2", "broken", "slow", "app3"]
+    results, errors = asyncio.run(fan_out("dynamo", read, keys, limit=2, timeout=0.2))
+
+    assert results == {"app1": "APP1", "app2": "APP2", "app3": "APP3"}
+    assert errors == {"broken": "no such app", "slow": "timed out after 0.2s"}
+    assert max(peak) <= 2
@@ -0,0 +1,58 @@
+import asyncio
+import cache_util
+from cache_util import ReadCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_read_cache_1(monkeypatch):
+    # entries are served until their namespace TTL runs out
+    clock = Clock()
+    monkeypatch.setattr(cache_util.time, "monotonic", clock)
+    cache = ReadCache({"teams": 300, "apps": 30})
+    calls = []
+    read = lambda value: lambda: calls.append(value) or value
+
+    assert cache.get("teams", None, read("teams")) == "teams"
+    assert cache.get("apps", 1, read("apps")) == "apps"
+    clock.now = 31
+    assert cache.get("teams", None, read("teams again")) == "teams"
+    assert cache.get("apps", 1, read("apps again")) == "apps again"
+    assert calls == ["teams", "apps", "apps again"]
+    assert cache.get_stats()["apps"]["misses"] == 2
+
+
+def test_read_cache_2():
+    # the least recently used entry is evicted first
+    cache = ReadCache({}, max_entries=2)
+    cache.get("apps", 1, lambda: "a")
+    cache.get("apps", 2, lambda: "b")
+    cache.get("apps", 1, lambda: "a again")
+    cache.get("apps", 3, lambda: "c")
+
+    assert cache.get("apps", 1, lambda: "a again") == "a"
+    assert cache.get("apps", 2, lambda: "b again") == "b again"
+
+
+def test_read_cache_3():
+    # errors (None) and values keep rejects are not cached, invalidate drops a namespace
+    cache = ReadCache({})
+    assert cache.get("apps", 1, lambda: None) is None
+    assert cache.get("apps", 1, lambda: "a") == "a"
+
+    async def partial():
+        return {"errors": {"app1": "timed out"}}
+
+    keep = lambda dashboard: not dashboard.get("errors")
+    assert asyncio.run(cache.get_async("dashboard", 1, partial, keep=keep))["errors"]
+    assert cache.get("dashboard", 1, lambda: "full") == "full"
+
+    cache.invalidate("apps")
+    assert cache.get("apps", 1, lambda: "a again") == "a again"
+    assert cache.get("dashboard", 1, lambda: "full again") == "full"
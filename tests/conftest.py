@@ -0,0 +1,5 @@
+import os
+import sys
+
+# cortex-backend is a directory of flat modules, not a package
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cortex-backend"))
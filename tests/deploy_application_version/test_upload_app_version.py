@@ -0,0 +1,37 @@
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.deploy_application_version import upload_app, upload_app_version
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=1, apps_per_team=0, versions_per_app=0))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def upload(version):
+    return upload_app_version(
+        "app1", version, "services: []\n", 0, 0, 100 + version,
+        [{"app": "app1", "svc": "svc1", "svc_ver": "1.0.0"}], [], [],
+    )
+
+
+def test_upload_app_version_1(memory):
+    # the version and its dashboard row are both written
+    upload_app("app1", 1, 1, 1)
+    upload(1)
+
+    assert dynamo_util.get_app_version("app1", 1)["run_id"] == 101
+    app_versions, missing = dynamo_util.get_team_dashboard_versions(1, dynamo_util.get_apps(1))
+    assert [av["version"] for av in app_versions] == [1] and missing == []
+
+
+def test_upload_app_version_2(memory):
+    # without TeamDashboard the version is still registered
+    dynamo_util.get_dynamodb().meta.client.delete_table(TableName="TeamDashboard")
+    upload_app("app1", 1, 1, 1)
+    upload(1)
+
+    assert dynamo_util.get_app_version("app1", 1)["run_id"] == 101
@@ -0,0 +1,43 @@
+from cortex.dynamo_util import build_dashboard, dashboard_version_row
+
+
+APP_VERSION = {
+    "app_name": "app1",
+    "version": 2,
+    "run_id": 42,
+    "yaml_z": b"...",
+    "services": [{"app": "app1", "svc": "svc1", "svc_ver": "1.0.0"}, {"app": "app1", "svc": "svc2", "svc_ver": "2.0.0"}],
+    "dependencies": [{"app": "shared-app", "svc": "svc3", "svc_ver": "1.1.0"}],
+    "links": [
+        {"source": {"app": "app1", "svc": "svc1"}, "target": {"app": "app1", "svc": "svc2"}},
+        {"source": {"app": "app1", "svc": "svc2"}, "target": {"app": "shared-app", "svc": "svc3"}},
+    ],
+}
+
+
+def test_build_dashboard_1():
+    # materialized rows give the same dashboard as the raw app versions
+    row = dashboard_version_row(1, APP_VERSION)
+    assert row["sk"] == "version#app1#00000002"
+    assert "yaml_z" not in row
+
+    from_rows = build_dashboard([], [row])
+    from_versions = build_dashboard([], [{k: v for k, v in APP_VERSION.items() if k != "yaml_z"}])
+    assert from_rows == from_versions
+    assert from_rows["dependency_graph"] == {
+        "app1/svc1@1.0.0": [{"target": "app1/svc2@2.0.0", "appVersion": 2}],
+        "app1/svc2@2.0.0": [{"target": "shared-app/svc3@1.1.0", "appVersion": 2}],
+    }
+    assert from_rows["services"] == {"app1/svc1", "app1/svc2", "shared-app/svc3"}
+
+
+def test_build_dashboard_2():
+    # a link to a service the version doesn't declare is skipped, not fatal
+    app_version = {**APP_VERSION, "links": APP_VERSION["links"] + [
+        {"source": {"app": "app1", "svc": "svc1"}, "target": {"app": "other-app", "svc": "svc9"}},
+    ]}
+
+    assert dashboard_version_row(1, app_version)["edges"] == [
+        {"source": "app1/svc1@1.0.0", "target": "app1/svc2@2.0.0"},
+        {"source": "app1/svc2@2.0.0", "target": "shared-app/svc3@1.1.0"},
+    ]
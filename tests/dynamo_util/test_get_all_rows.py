@@ -0,0 +1,28 @@
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=2, apps_per_team=2, versions_per_app=2))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_get_all_rows_1(memory):
+    # items come back as plain python values, not typed {"S": ...} dicts
+    rows = dynamo_util.get_all_rows("apps", ["name", "team_id"], segments=3)
+
+    assert sorted((r["name"], r["team_id"]) for r in rows) == [
+        ("team1-app0", 1), ("team1-app1", 1), ("team2-app0", 2), ("team2-app1", 2),
+    ]
+
+
+def test_get_all_rows_2(memory):
+    # an explicit client, as manual/dynamo_reset.py passes for its region
+    client = dynamo_util.new_session().client("dynamodb", region_name="us-east-1")
+
+    rows = dynamo_util.get_all_rows("Teams", client=client)
+
+    assert sorted(r["team_id"] for r in rows) == [1, 2]
@@ -0,0 +1,23 @@
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=1, apps_per_team=1, versions_per_app=5))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_get_app_versions_page_1(memory):
+    # pages are newest first and the cursor picks up where the last page stopped
+    pages, cursor = [], None
+    while True:
+        versions, cursor = dynamo_util.get_app_versions_page("team1-app0", 2, cursor)
+        pages.append([v["version"] for v in versions])
+        if cursor is None:
+            break
+
+    assert pages == [[5, 4], [3, 2], [1]]
+    assert [v["version"] for v in dynamo_util.get_app_versions("team1-app0")] == [1, 2, 3, 4, 5]
@@ -0,0 +1,24 @@
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=1, apps_per_team=1, versions_per_app=1))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_get_services_by_name_1(memory):
+    known, new = "team1-app0/svc0@1.0.1", "team1-app0/svc9@1.0.1"
+    assert set(dynamo_util.get_services_by_name([known, new])) == {known}
+
+    # registered by a deploy in another process, which can't invalidate this index
+    dynamo_util.get_table("services").put_item(Item={"name": new, "app": "team1-app0", "svc": "svc9", "ver": "1.0.1"})
+    calls = memory.calls["BatchGetItem"]
+
+    assert set(dynamo_util.get_services_by_name([known, new])) == {known, new}
+    assert memory.calls["BatchGetItem"] == calls + 1
+    assert set(dynamo_util.get_services_by_name([known, new])) == {known, new}
+    assert memory.calls["BatchGetItem"] == calls + 1
@@ -0,0 +1,33 @@
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=1, apps_per_team=3, versions_per_app=2))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_get_team_dashboard_versions_1(memory):
+    # app0 has every version in TeamDashboard, app1 only its latest deploy, app2 none
+    table = dynamo_util.get_table("team_dashboard")
+    for app_name, versions in [("team1-app0", [1, 2]), ("team1-app1", [2])]:
+        for version in versions:
+            app_version = dynamo_util.get_app_version(app_name, version)
+            table.put_item(Item=dynamo_util.dashboard_version_row(1, app_version))
+    apps = dynamo_util.get_apps(1)
+
+    app_versions, missing = dynamo_util.get_team_dashboard_versions(1, apps)
+
+    assert [(av["app_name"], av["version"]) for av in app_versions] == [("team1-app0", 1), ("team1-app0", 2)]
+    assert missing == ["team1-app1", "team1-app2"]
+
+
+def test_get_team_dashboard_versions_2(memory):
+    # before TeamDashboard is created every app is read from AppVersions
+    dynamo_util.get_dynamodb().meta.client.delete_table(TableName="TeamDashboard")
+    apps = dynamo_util.get_apps(1)
+
+    assert dynamo_util.get_team_dashboard_versions(1, apps) == ([], ["team1-app0", "team1-app1", "team1-app2"])
@@ -0,0 +1,71 @@
+import cortex.dynamo_util as dynamo_util
+
+
+class FakeAppVersionsTable:
+    def __init__(self, versions, page_size=2):
+        self.items = [{"app_name": "app1", "version": v, "run_id": v * 10, "yaml": "..."} for v in versions]
+        self.page_size = page_size
+        self.calls = []
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        items = sorted(self.items, key=lambda i: i["version"], reverse=not kwargs["ScanIndexForward"])
+        start = kwargs.get("ExclusiveStartKey")
+        if start:
+            items = items[[i["version"] for i in items].index(start["version"]) + 1:]
+        size = min(self.page_size, kwargs.get("Limit", self.page_size))
+        page = items[:size]
+        response = {"Items": page}
+        # like DynamoDB, reaching Limit returns a key even when nothing is left
+        if len(items) > size or len(page) == kwargs.get("Limit"):
+            response["LastEvaluatedKey"] = {"app_name": "app1", "version": page[-1]["version"]}
+        return response
+
+
+def test_iter_app_versions_1(monkeypatch):
+    # follows LastEvaluatedKey past the first page
+    table = FakeAppVersionsTable([1, 2, 3, 4, 5])
+    monkeypatch.setattr(dynamo_util, "get_table", lambda name: table)
+
+    versions = [i["version"] for i in dynamo_util.iter_app_versions("app1", "summary")]
+    assert versions == [1, 2, 3, 4, 5]
+    assert len(table.calls) == 3
+    assert table.calls[0]["ExpressionAttributeNames"] == {"#p0": "app_name", "#p1": "version", "#p2": "run_id"}
+
+
+def test_iter_app_versions_2(monkeypatch):
+    # newest first with a limit stops reading once it has enough
+    table = FakeAppVersionsTable([1, 2, 3, 4, 5])
+    monkeypatch.setattr(dynamo_util, "get_table", lambda name: table)
+
+    versions = [i["version"] for i in dynamo_util.iter_app_versions("app1", limit=3, newest_first=True)]
+    assert versions == [5, 4, 3]
+    assert [c["Limit"] for c in table.calls] == [4, 2]
+    assert "ProjectionExpression" not in table.calls[0]
+
+
+def test_query_app_versions_page_1(monkeypatch):
+    table = FakeAppVersionsTable([1, 2, 3])
+    monkeypatch.setattr(dynamo_util, "get_table", lambda name: table)
+
+    items, cursor = dynamo_util.query_app_versions_page("app1", "summary", limit=2)
+    assert [i["version"] for i in items] == [1, 2]
+    assert cursor == 2
+
+    items, cursor = dynamo_util.query_app_versions_page("app1", "summary", limit=2, cursor=cursor)
+    assert [i["version"] for i in items] == [3]
+    assert cursor is None
+
+
+def test_query_app_versions_page_2(monkeypatch):
+    # a page that exactly fills the limit is the last one when nothing follows
+    table = FakeAppVersionsTable([1, 2, 3, 4], page_size=10)
+    monkeypatch.setattr(dynamo_util, "get_table", lambda name: table)
+
+    items, cursor = dynamo_util.query_app_versions_page("app1", "summary", limit=2)
+    assert [i["version"] for i in items] == [1, 2]
+    assert cursor == 2
+
+    items, cursor = dynamo_util.query_app_versions_page("app1", "summary", limit=2, cursor=cursor)
+    assert [i["version"] for i in items] == [3, 4]
+    assert cursor is None
@@ -0,0 +1,20 @@
+from boto3.dynamodb.types import Binary
+from cortex.dynamo_util import encode_manifest, decode_manifest
+
+
+RAW = "services:\n- app: app1\n  svc: svc1\n  svc_ver: 1.0.0\n" * 20
+
+
+def test_manifest_codec_1():
+    item = encode_manifest({"app_name": "app1", "version": 1, "yaml": RAW})
+    assert "yaml" not in item
+    assert len(item["yaml_z"]) < len(RAW)
+    assert decode_manifest(item) == {"app_name": "app1", "version": 1, "yaml": RAW}
+
+
+def test_manifest_codec_2():
+    # resource reads hand back Binary, items written before compression pass through
+    item = encode_manifest({"version": 1, "yaml": RAW})
+    assert decode_manifest({**item, "yaml_z": Binary(item["yaml_z"])})["yaml"] == RAW
+    assert decode_manifest({"version": 1, "yaml": RAW}) == {"version": 1, "yaml": RAW}
+    assert decode_manifest(None) is None
@@ -0,0 +1,41 @@
+from botocore.stub import Stubber
+import pytest
+from botocore.exceptions import ClientError
+import cortex.dynamo_util as dynamo_util
+
+
+PUTS = [
+    ("services", {"name": "app1/svc1@1.0.0", "ver": "1.0.0"}),
+    ("app_versions", {"app_name": "app1", "version": 3, "run_id": 42}),
+]
+
+
+def conflict(stubber, code="TransactionConflict"):
+    stubber.add_client_error(
+        "transact_write_items", "TransactionCanceledException",
+        modeled_fields={"CancellationReasons": [{"Code": "None"}, {"Code": code}]},
+    )
+
+
+def test_write_items_1(monkeypatch):
+    # one transaction across tables, retried after a conflict
+    monkeypatch.setattr(dynamo_util.time, "sleep", lambda s: None)
+    client = dynamo_util.get_client()
+    with Stubber(client) as stubber:
+        conflict(stubber)
+        stubber.add_response("transact_write_items", {}, {"TransactItems": [
+            {"Put": {"TableName": "Services", "Item": {"name": {"S": "app1/svc1@1.0.0"}, "ver": {"S": "1.0.0"}}}},
+            {"Put": {"TableName": "AppVersions", "Item": {"app_name": {"S": "app1"}, "version": {"N": "3"}, "run_id": {"N": "42"}}}},
+        ]})
+        dynamo_util.write_items(PUTS)
+        stubber.assert_no_pending_responses()
+
+
+def test_write_items_2(monkeypatch):
+    # validation failures are not retried
+    monkeypatch.setattr(dynamo_util.time, "sleep", lambda s: None)
+    client = dynamo_util.get_client()
+    with Stubber(client) as stubber:
+        conflict(stubber, "ConditionalCheckFailed")
+        with pytest.raises(ClientError):
+            dynamo_util.write_items(PUTS)
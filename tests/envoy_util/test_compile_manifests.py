@@ -0,0 +1,33 @@
+import os
+from cortex.envoy_util import compile_manifests, read_manifests
+
+
+def test_compile_manifests_1():
+    path = os.path.join(os.path.dirname(__file__), "app-version-manifests")
+    manifests = read_manifests(path)
+    cache = {}
+
+    routes, lookup, changed_apps = compile_manifests(manifests, cache)
+    assert changed_apps == {"app1", "shared-app"}
+    assert len(routes) == 16
+    assert lookup[("app1", "service-b", 2)] == "0.0.2"
+    assert lookup[("shared-app", "service-s", 1)] == "0.0.1"
+
+    assert compile_manifests(manifests, cache) == (routes, lookup, set())
+
+
+def test_compile_manifests_2():
+    path = os.path.join(os.path.dirname(__file__), "app-version-manifests")
+    manifests = read_manifests(path)
+    cache = {}
+    compile_manifests(manifests, cache)
+
+    manifests["shared-app/3.yaml"] = manifests["shared-app/2.yaml"].replace(b"0.0.2", b"0.0.3")
+    del manifests["app1/1.yaml"]
+    routes, lookup, changed_apps = compile_manifests(manifests, cache)
+
+    # app1 lost a manifest, so its contribution changed too
+    assert changed_apps == {"app1", "shared-app"}
+    assert len(cache) == 4
+    assert ("app1", "mfe-a", 1) not in lookup
+    assert lookup[("shared-app", "service-s", 3)] == "0.0.3"
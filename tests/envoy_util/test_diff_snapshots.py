@@ -0,0 +1,28 @@
+from cortex.envoy_util import build_snapshot, diff_snapshots, route_id
+
+
+def test_diff_snapshots_1():
+    routes = [
+        {"prefix": "/app1/mfe-a/", "headers": [{"Name": "X-App-Version", "Value": "1"}], "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/app1/service-b/", "cluster": "app1-service-b-0-0-1"},
+    ]
+    new_routes = [
+        routes[0],
+        {"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-2"},
+        {"prefix": "/app2/mfe-x/", "cluster": "app2-mfe-x-0-0-1"},
+    ]
+    previous = build_snapshot(routes)
+    assert build_snapshot(list(routes)) == previous
+
+    snapshot = build_snapshot(new_routes)
+    delta = diff_snapshots(previous, snapshot, new_routes)
+
+    assert delta["base"] == previous["fingerprint"]
+    assert delta["order"] == [route_id(r) for r in new_routes]
+    assert delta["routes"]["added"] == [new_routes[2]]
+    assert delta["routes"]["removed"] == [route_id(routes[2])]
+    assert delta["routes"]["changed"] == [new_routes[1]]
+    assert [c["cluster"] for c in delta["clusters"]["added"]] == ["app1-mfe-a-0-0-2", "app2-mfe-x-0-0-1"]
+    assert delta["clusters"]["removed"] == ["app1-service-b-0-0-1"]
+    assert delta["clusters"]["changed"] == []
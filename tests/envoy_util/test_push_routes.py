@@ -0,0 +1,59 @@
+import cortex.envoy_util as envoy_util
+
+
+class FakeControlPlane:
+    def __init__(self):
+        self.version = 0
+        self.posts = []
+
+    def get(self, url, timeout=None):
+        return FakeResponse({"version": self.version})
+
+    def post(self, url, json=None):
+        self.version += 1
+        self.posts.append(url)
+        return FakeResponse({})
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+ROUTES = [{"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-1"}]
+
+
+def test_push_routes_1(tmp_path, monkeypatch):
+    # an unchanged table is only skipped while the control plane still serves our last push
+    control_plane = FakeControlPlane()
+    monkeypatch.setattr(envoy_util, "requests", control_plane)
+    push = lambda **kwargs: envoy_util.push_routes(
+        ROUTES, "http://cp/api/v1/routes", snapshot_path=str(tmp_path / "snapshot.json"),
+        resources_url="http://cp/api/v1/resources", **kwargs,
+    )
+
+    assert push() is not None
+    assert push() is None
+    assert push(force=True) is not None
+    assert len(control_plane.posts) == 2
+
+    # restarted, the control plane lost its routes and counts versions from 0 again
+    control_plane.version = 0
+    assert push() is not None
+    assert push() is None
+    assert len(control_plane.posts) == 3
+
+
+def test_push_routes_2():
+    assert envoy_util.default_resources_url("http://cp/api/v1/routes") == "http://cp/api/v1/resources"
+    assert envoy_util.default_resources_url("http://cp/custom") is None
@@ -0,0 +1,16 @@
+from cortex.envoy_util import referenced_services
+
+
+def test_referenced_services_1():
+    routes = [
+        {"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/shared-app/service-s/", "cluster": "shared-app-service-s-0-0-2"},
+        {"prefix": "/app1/main/", "headers": [], "weighted_clusters": []},
+    ]
+    lookup = {
+        ("app1", "mfe-a", 1): "0.0.1",
+        ("app1", "mfe-a", 2): "0.0.1",
+        ("shared-app", "service-s", 1): "0.0.1",
+        ("shared-app", "service-s", 2): "0.0.2",
+    }
+    assert sorted(referenced_services(routes, lookup)) == ["app1/mfe-a@0.0.1", "shared-app/service-s@0.0.2"]
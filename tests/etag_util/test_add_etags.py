@@ -0,0 +1,46 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from etag_util import add_etags
+
+
+def make_app():
+    app = FastAPI()
+    add_etags(app, {"/get_apps": "private, no-cache"})
+    state = {"apps": ["app1"]}
+
+    @app.get("/get_apps")
+    async def get_apps():
+        return {"apps": state["apps"]}
+
+    @app.get("/hello")
+    async def hello():
+        return {"message": "hello"}
+
+    return app, state
+
+
+def test_add_etags_1():
+    # a matching If-None-Match gets an empty 304 until the body changes
+    app, state = make_app()
+    client = TestClient(app)
+
+    first = client.get("/get_apps")
+    tag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    unchanged = client.get("/get_apps", headers={"If-None-Match": f'W/"other", {tag}'})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    state["apps"].append("app2")
+    changed = client.get("/get_apps", headers={"If-None-Match": tag})
+    assert changed.status_code == 200
+    assert changed.json() == {"apps": ["app1", "app2"]}
+    assert changed.headers["etag"] != tag
+
+
+def test_add_etags_2():
+    # paths without a policy are passed through untagged
+    app, _ = make_app()
+    assert "etag" not in TestClient(app).get("/hello").headers
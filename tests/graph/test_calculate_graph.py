@@ -0,0 +1,14 @@
+import os
+import json
+from cortex.graph import calculate_graph
+
+MANIFESTS = os.path.join(os.path.dirname(__file__), "..", "envoy_util", "app-version-manifests")
+
+
+def test_calculate_graph_1():
+    # graphs are stored as JSON at deploy time, so they have to survive the round-trip
+    raw = open(os.path.join(MANIFESTS, "app1", "1.yaml")).read()
+    graph = calculate_graph("app1", raw)
+    assert json.loads(json.dumps(graph)) == graph
+    assert graph["apps"][0]["id"] == "app1"
+    assert all("x" in s and "y" in s for s in graph["services"])
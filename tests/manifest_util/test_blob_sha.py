@@ -0,0 +1,7 @@
+from cortex.manifest_util import blob_sha
+
+
+def test_blob_sha_1():
+    # matches `git hash-object` so mirror keys line up with the deploy log tree
+    assert blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+    assert blob_sha("hello\n") == blob_sha(b"hello\n")
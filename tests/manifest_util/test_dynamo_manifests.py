@@ -0,0 +1,28 @@
+import json
+import pytest
+import cortex.dynamo_util as dynamo_util
+from cortex.manifest_util import dynamo_manifests
+from cortex.memory_dynamo_util import MemoryDynamo
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=1, apps_per_team=2, versions_per_app=3))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_dynamo_manifests_1(memory):
+    # raw and compressed manifests both come back as the stored yaml
+    dynamo_util.get_table("app_versions").put_item(Item=dynamo_util.encode_manifest(
+        {"app_name": "team1-app1", "version": 4, "yaml": "services: []\n"}
+    ))
+
+    manifests = dynamo_manifests(max_workers=2)
+
+    assert sorted(manifests) == [
+        "team1-app0/1.yaml", "team1-app0/2.yaml", "team1-app0/3.yaml",
+        "team1-app1/1.yaml", "team1-app1/2.yaml", "team1-app1/3.yaml", "team1-app1/4.yaml",
+    ]
+    assert json.loads(manifests["team1-app0/2.yaml"])["routes"][0]["headers"]["X-App-Version"] == 2
+    assert manifests["team1-app1/4.yaml"] == "services: []\n"
@@ -0,0 +1,19 @@
+import io, os, tarfile
+from cortex.manifest_util import iter_archive_manifests
+
+
+def test_iter_archive_manifests_1():
+    path = os.path.join(os.path.dirname(__file__), "..", "envoy_util", "app-version-manifests")
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        archive.add(path, arcname="hugh-nguyen-cortex-deploy-log-abc1234/app-version-manifests")
+        readme = b"# cortex-deploy-log\n"
+        info = tarfile.TarInfo("hugh-nguyen-cortex-deploy-log-abc1234/README.md")
+        info.size = len(readme)
+        archive.addfile(info, io.BytesIO(readme))
+    buffer.seek(0)
+
+    manifests = dict(iter_archive_manifests(buffer))
+
+    assert sorted(manifests) == ["app1/1.yaml", "app1/2.yaml", "shared-app/1.yaml", "shared-app/2.yaml"]
+    assert manifests["app1/2.yaml"] == open(os.path.join(path, "app1", "2.yaml"), "rb").read()
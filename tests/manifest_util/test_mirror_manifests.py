@@ -0,0 +1,84 @@
+import pytest
+import cortex.manifest_util as manifest_util
+from cortex.manifest_util import blob_sha, mirror_manifests, fetch_blob
+
+APP1 = b"routes: [app1]\n"
+APP2 = b"routes: [app2]\n"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, json_data=None, content=b"", etag=None):
+        self.status_code = status_code
+        self._json = json_data
+        self.content = content
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeGitHub:
+    """Serves the deploy log tree and blobs, honouring If-None-Match"""
+
+    def __init__(self, files, etag='"1"'):
+        self.files = files
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, headers={}, **kwargs):
+        self.requests.append((url, headers))
+        if "/git/trees/" in url:
+            if headers.get("If-None-Match") == self.etag:
+                return FakeResponse(304)
+            tree = [
+                {"path": f"app-version-manifests/{path}", "type": "blob", "sha": blob_sha(raw)}
+                for path, raw in self.files.items()
+            ]
+            return FakeResponse(json_data={"tree": tree}, etag=self.etag)
+        sha = url.rsplit("/", 1)[1]
+        blobs = {blob_sha(raw): raw for raw in self.files.values()}
+        return FakeResponse(content=blobs[sha])
+
+
+@pytest.fixture
+def github(monkeypatch):
+    github = FakeGitHub({"app1/1.yaml": APP1, "app2/1.yaml": APP2})
+    monkeypatch.setattr(manifest_util, "request_get", github.get)
+    return github
+
+
+def test_mirror_manifests_1(github, tmp_path):
+    # an unchanged tree (304) is served from the mirror without downloading blobs
+    assert mirror_manifests(str(tmp_path)) == {"app1/1.yaml": APP1, "app2/1.yaml": APP2}
+    assert len(github.requests) == 3
+
+    github.requests.clear()
+    assert mirror_manifests(str(tmp_path)) == {"app1/1.yaml": APP1, "app2/1.yaml": APP2}
+    assert len(github.requests) == 1
+    assert github.requests[0][1] == {"If-None-Match": '"1"'}
+
+
+def test_mirror_manifests_2(github, tmp_path):
+    # a changed tree only downloads new blobs and prunes removed manifests
+    mirror_manifests(str(tmp_path))
+
+    app3 = b"routes: [app3]\n"
+    github.files = {"app1/1.yaml": APP1, "app3/1.yaml": app3}
+    github.etag = '"2"'
+    github.requests.clear()
+
+    assert mirror_manifests(str(tmp_path)) == {"app1/1.yaml": APP1, "app3/1.yaml": app3}
+    assert [url.rsplit("/", 1)[1] for url, _ in github.requests[1:]] == [blob_sha(app3)]
+    assert not (tmp_path / "blobs" / blob_sha(APP2)).exists()
+
+
+def test_fetch_blob_1(monkeypatch):
+    # a body that doesn't hash to the requested sha is rejected, not cached
+    sha = blob_sha(APP1)
+    monkeypatch.setattr(manifest_util, "request_get", lambda url, headers={}: FakeResponse(content=APP1[:-3]))
+    with pytest.raises(ValueError):
+        fetch_blob(sha)
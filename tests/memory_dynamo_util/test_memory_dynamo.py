@@ -0,0 +1,61 @@
+import os
+import pytest
+from botocore.exceptions import ClientError
+import cortex.dynamo_util as dynamo_util
+import cortex.memory_dynamo_util as memory_dynamo_util
+from cortex.memory_dynamo_util import MemoryDynamo
+
+MANUAL = os.path.join(os.path.dirname(__file__), "..", "..", "manual")
+
+
+@pytest.fixture
+def memory():
+    memory = dynamo_util.use_memory_dynamo(MemoryDynamo().seed_fleet(teams=2, apps_per_team=3, versions_per_app=6))
+    yield memory
+    dynamo_util.use_memory_dynamo(None)
+
+
+def test_memory_dynamo_1(memory, monkeypatch):
+    # small pages so every reader has to follow LastEvaluatedKey
+    monkeypatch.setattr(memory_dynamo_util, "PAGE_BYTES", 2048)
+
+    assert len(dynamo_util.get_all_rows("services")) == 2 * 3 * 6 * 4
+    assert len(dynamo_util.get_all_rows("app_versions", ["app_name"], segments=1)) == 2 * 3 * 6
+    versions = [v["version"] for v in dynamo_util.iter_app_versions("team1-app0")]
+    assert versions == [1, 2, 3, 4, 5, 6]
+    assert memory.calls["Query"] > 1
+
+    assert [v["version"] for v in dynamo_util.iter_app_versions("team1-app0", "summary", limit=2, newest_first=True)] == [6, 5]
+    assert [a["App"] for a in dynamo_util.get_apps(2)] == ["team2-app0", "team2-app1", "team2-app2"]
+    assert dynamo_util.get_app("team1-app2")["Versions"] == 6
+
+
+def test_memory_dynamo_2(memory):
+    # a failed condition cancels the whole transaction
+    table = dynamo_util.get_table("apps")
+    with pytest.raises(ClientError) as e:
+        dynamo_util.get_client().transact_write_items(TransactItems=[
+            {"Put": {"TableName": "Services", "Item": {"name": {"S": "new/svc@1"}}}},
+            {"Put": {
+                "TableName": "Apps",
+                "Item": {"name": {"S": "team1-app0"}},
+                "ConditionExpression": "attribute_not_exists(#n)",
+                "ExpressionAttributeNames": {"#n": "name"},
+            }},
+        ])
+    assert e.value.response["Error"]["Code"] == "TransactionCanceledException"
+    assert [r["Code"] for r in e.value.response["CancellationReasons"]] == ["None", "ConditionalCheckFailed"]
+    assert dynamo_util.get_service("new/svc@1") is None
+    assert table.get_item(Key={"name": "team1-app0"})["Item"]["versions"] == 6
+
+
+def test_memory_dynamo_3():
+    # the manual upload scripts seed it as they would a real table
+    memory = MemoryDynamo()
+    memory.seed_from_script(os.path.join(MANUAL, "dynamo_test_data.py"))
+    dynamo_util.use_memory_dynamo(memory)
+    try:
+        assert sorted(dynamo_util.get_app_names()) == ["test-app1", "test-app2", "test-shared-app"]
+        assert dynamo_util.get_teams() == [{"team_id": 4, "team_name": "Team Delta"}]
+    finally:
+        dynamo_util.use_memory_dynamo(None)
@@ -0,0 +1,59 @@
+from cortex.route_util import sort_routes, sort_services, manifest_sort_key
+
+
+def test_sort_routes_1():
+    routes = [
+        {"prefix": "/shared-app/service-s/", "cluster": "shared-app-service-s-0-0-1"},
+        {"prefix": "/shared-app/service-s/", "cluster": "shared-app-service-s-0-0-2"},
+        {
+            "prefix": "/shared-app/service-s/",
+            "headers": [{"Name": "X-App-Name", "Value": "app1"}],
+            "cluster": "shared-app-service-s-0-0-1",
+        },
+        {
+            "prefix": "/shared-app/service-s/",
+            "headers": [
+                {"Name": "X-App-Name", "Value": "app1"},
+                {"Name": "X-App-Version", "Value": "1"},
+            ],
+            "cluster": "shared-app-service-s-0-0-1",
+        },
+        {"prefix": "/shared-app/service-s/", "cluster": "shared-app-service-s-0-0-1"},
+    ]
+    result = sort_routes(routes)
+
+    assert [len(r.get("headers", [])) for r in result] == [2, 1, 0]
+    assert result[-1]["cluster"] == "shared-app-service-s-0-0-2"
+
+
+def test_sort_routes_2():
+    custom = {"prefix": "/app1/main/", "headers": [], "weighted_clusters": [], "custom": True}
+    routes = [
+        {"prefix": "/app1/main/", "cluster": "app1-mfe-a-0-0-9"},
+        custom,
+    ]
+    assert sort_routes(routes) == [{"prefix": "/app1/main/", "headers": [], "weighted_clusters": []}]
+    assert custom["custom"] == True
+
+
+def test_sort_routes_3():
+    routes = [
+        {"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/app1/mfe-a/", "headers": {"X-App-Version": 10}, "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/app1/mfe-a/", "headers": {"X-App-Version": 9}, "cluster": "app1-mfe-a-0-0-1"},
+        {"prefix": "/app1/mfe-a/", "cluster": "app1-mfe-a-0-0-1"},
+    ]
+    result = sort_routes(routes, False, manifest_sort_key)
+    assert [r.get("headers") for r in result] == [{"X-App-Version": 9}, {"X-App-Version": 10}, None]
+
+
+def test_sort_services_1():
+    services = [
+        {"app": "app1", "svc": "service-b", "svc_ver": "0.0.1"},
+        {"app": "app1", "svc": "mfe-a", "svc_ver": "0.0.1"},
+        {"app": "app1", "svc": "service-b", "svc_ver": "0.0.1"},
+    ]
+    assert sort_services(services) == [
+        {"app": "app1", "svc": "mfe-a", "svc_ver": "0.0.1"},
+        {"app": "app1", "svc": "service-b", "svc_ver": "0.0.1"},
+    ]
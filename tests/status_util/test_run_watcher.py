@@ -0,0 +1,62 @@
+import asyncio
+from status_util import RunWatcher
+
+
+def run(id, status, conclusion=None):
+    return {"id": id, "status": status, "conclusion": conclusion}
+
+
+def test_run_watcher_1():
+    # subscribers share one poller and only hear about snapshots that changed
+    responses = [
+        [run(1, "in_progress")],
+        [run(1, "in_progress")],
+        [run(1, "completed", "success")],
+    ]
+    calls = []
+
+    async def fetch(repo_url, workflow_name):
+        calls.append(repo_url)
+        return {"workflow_runs": responses[min(len(calls), len(responses)) - 1]}
+
+    async def scenario():
+        watcher = RunWatcher(fetch, interval=0.01, idle_interval=60)
+        first = watcher.subscribe("https://github.com/x/app1", "deploy")
+        second = watcher.subscribe("https://github.com/x/app1", "deploy")
+
+        snapshot = await asyncio.wait_for(first.get(), 1)
+        assert snapshot["incomplete_runs"] == [run(1, "in_progress")]
+        assert (await asyncio.wait_for(second.get(), 1)) is snapshot
+
+        snapshot = await asyncio.wait_for(first.get(), 1)
+        assert snapshot["incomplete_runs"] == []
+        assert len(calls) == 3
+        # nothing in flight, the poller now waits idle_interval and serves its snapshot
+        assert watcher.latest("https://github.com/x/app1", "deploy") is snapshot
+
+        watcher.unsubscribe("https://github.com/x/app1", "deploy", first)
+        watcher.unsubscribe("https://github.com/x/app1", "deploy", second)
+        assert watcher.latest("https://github.com/x/app1", "deploy") is None
+
+    asyncio.run(scenario())
+
+
+def test_run_watcher_2():
+    # refresh wakes an idle poller straight away
+    calls = []
+
+    async def fetch(repo_url, workflow_name):
+        calls.append(repo_url)
+        return {"workflow_runs": [run(len(calls), "completed", "success")]}
+
+    async def scenario():
+        watcher = RunWatcher(fetch, interval=60, idle_interval=60)
+        queue = watcher.subscribe("https://github.com/x/app1", "deploy")
+        await asyncio.wait_for(queue.get(), 1)
+
+        watcher.refresh("https://github.com/X/app1/")
+        snapshot = await asyncio.wait_for(queue.get(), 1)
+        assert snapshot["workflow_runs"][0]["id"] == 2
+        watcher.unsubscribe("https://github.com/x/app1", "deploy", queue)
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import threading
+from trigger_util import CoalescingTrigger
+
+
+def test_coalescing_trigger_1():
+    # requests within the debounce share one job and merge their kwargs
+    calls = []
+    trigger = CoalescingTrigger(lambda **kwargs: calls.append(kwargs) or len(calls), debounce=0.05)
+
+    jobs = [trigger.request(), trigger.request(force=True), trigger.request()]
+    assert len({job["job_id"] for job in jobs}) == 1
+
+    job = trigger.wait(jobs[0]["job_id"], timeout=5)
+    assert job["status"] == "succeeded"
+    assert job["requests"] == 3
+    assert job["result"] == 1
+    assert calls == [{"force": True}]
+
+
+def test_coalescing_trigger_2():
+    # a request made mid-run queues one follow-up, run on the same worker thread
+    started, release = threading.Event(), threading.Event()
+    threads = []
+
+    def fn():
+        threads.append(threading.get_ident())
+        if len(threads) == 1:
+            started.set()
+            release.wait(5)
+
+    trigger = CoalescingTrigger(fn, debounce=0.01)
+    first = trigger.request()
+    assert started.wait(5)
+    followups = [trigger.request(), trigger.request()]
+    release.set()
+
+    assert followups[0]["job_id"] == followups[1]["job_id"] != first["job_id"]
+    assert trigger.wait(followups[0]["job_id"], timeout=5)["status"] == "succeeded"
+    assert len(threads) == 2 and threads[0] == threads[1]
+
+
+def test_coalescing_trigger_3():
+    # a failing job reports its error instead of stopping the worker
+    def fn(fail=False):
+        if fail:
+            raise RuntimeError("push rejected")
+        return "ok"
+
+    trigger = CoalescingTrigger(fn, debounce=0.01)
+    failed = trigger.wait(trigger.request(fail=True)["job_id"], timeout=5)
+    assert failed["status"] == "failed" and failed["error"] == "push rejected"
+    assert trigger.wait(trigger.request()["job_id"], timeout=5)["result"] == "ok"